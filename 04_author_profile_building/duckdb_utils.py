@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Shared DuckDB helpers for the author profile building scripts.
+
+Inference scripts write one result per author. Sending those back with
+executemany runs one UPDATE statement per row, which is very slow in DuckDB;
+bulk_update applies a whole batch with a single set-based UPDATE instead.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+
+def configure_connection(conn, threads=None, memory_limit=None, temp_directory=None):
+    """
+    Apply bulk-processing settings to a DuckDB connection.
+
+    Uses every CPU core for scans, joins and UPDATEs, and drops insertion-order
+    preservation, which none of the batch scripts rely on and which limits
+    parallelism for large operations.
+
+    Args:
+        conn: DuckDB connection object
+        threads (int, optional): Worker threads (default: CPU count)
+        memory_limit (str, optional): Memory limit such as '16GB' (default: DuckDB's own)
+        temp_directory (str, optional): Spill directory for larger-than-memory work
+    """
+    conn.execute(f"SET threads = {threads or os.cpu_count() or 1}")
+    conn.execute("SET preserve_insertion_order = false")
+    if memory_limit:
+        conn.execute(f"SET memory_limit = '{memory_limit}'")
+    if temp_directory:
+        conn.execute(f"SET temp_directory = '{temp_directory}'")
+
+
+def ensure_columns(conn, table_name, columns):
+    """
+    Add any missing columns to a table.
+
+    Uses ADD COLUMN IF NOT EXISTS, so no catalog lookup is needed and
+    repeated or concurrent calls are harmless.
+
+    Args:
+        conn: DuckDB connection object
+        table_name (str): Table to extend (e.g. 'authors')
+        columns (dict): Column name -> SQL type, e.g. {'consensus_ethnicity': 'TEXT'}
+    """
+    for column, sql_type in columns.items():
+        conn.execute(f'ALTER TABLE "{table_name}" ADD COLUMN IF NOT EXISTS "{column}" {sql_type}')
+
+
+def bulk_update(conn, table_name, key_col, updates, columns=None):
+    """
+    Apply a batch of per-row results to a table with one UPDATE ... FROM.
+
+    The updates are registered with DuckDB as a temporary view (zero-copy for
+    pandas DataFrames and Arrow tables), joined to the table on key_col, and
+    unregistered afterwards.
+
+    Args:
+        conn: DuckDB connection object
+        table_name (str): Table to update (e.g. 'authors')
+        key_col (str): Column identifying rows in both the table and the updates
+        updates: pandas DataFrame, pyarrow Table, or list of tuples (with columns)
+        columns (list, optional): Column names for a list of tuples. Every
+            column other than key_col is assigned to the table column of the
+            same name.
+
+    Returns:
+        int: Number of update rows applied
+    """
+    if columns is not None:
+        updates = pd.DataFrame(updates, columns=columns)
+
+    if len(updates) == 0:
+        return 0
+
+    view_name = f'_{table_name}_bulk_update'
+    column_names = updates.column_names if hasattr(updates, 'column_names') else updates.columns
+    value_cols = [col for col in column_names if col != key_col]
+    assignments = ', '.join(f'"{col}" = u."{col}"' for col in value_cols)
+
+    conn.register(view_name, updates)
+    try:
+        conn.execute(
+            f"""
+            UPDATE "{table_name}"
+            SET {assignments}
+            FROM {view_name} u
+            WHERE "{table_name}"."{key_col}" = u."{key_col}"
+            """
+        )
+    finally:
+        conn.unregister(view_name)
+
+    return len(updates)
+
+
+def prefetch_batches(reader):
+    """
+    Iterate an Arrow record batch reader, reading one batch ahead.
+
+    The next batch is fetched on a background thread while the caller works
+    on the current one, so DuckDB's scan overlaps with model inference.
+
+    Args:
+        reader: pyarrow RecordBatchReader, e.g. from fetch_record_batch()
+
+    Yields:
+        pyarrow.RecordBatch: Batches in reader order
+    """
+    batches = iter(reader)
+    with ThreadPoolExecutor(max_workers=1) as fetcher:
+        next_batch = fetcher.submit(next, batches, None)
+        while True:
+            batch = next_batch.result()
+            if batch is None:
+                return
+            next_batch = fetcher.submit(next, batches, None)
+            yield batch
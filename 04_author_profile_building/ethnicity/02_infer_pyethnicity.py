@@ -118,6 +118,11 @@ def infer_ethnicity_in_duckdb(db_file, batch_size=100):
     """
     logger = logging.getLogger(__name__)
 
+    db_file = Path(db_file)
+
+    if not db_file.exists():
+        raise FileNotFoundError(f"Database file not found: {db_file}")
+
     logger.info("="*70)
     logger.info("RACE/ETHNICITY INFERENCE USING PYETHNICITY")
     logger.info("="*70)
@@ -248,6 +253,30 @@ def infer_ethnicity_in_duckdb(db_file, batch_size=100):
     logger.info("="*70)
 
 
+def run(db_path, batch_size=100) -> bool:
+    """
+    Run pyethnicity inference in the current process.
+
+    Used by main() and by ethnicity_orchestrator.py, which calls it directly
+    instead of starting a new interpreter for each tool.
+
+    Args:
+        db_path (Path): Path to the DuckDB database file
+        batch_size (int): Number of records to process in each batch
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    logger = logging.getLogger(__name__)
+
+    try:
+        infer_ethnicity_in_duckdb(db_path, batch_size=batch_size)
+        return True
+    except Exception as e:
+        logger.error(f"Fatal error: {e}", exc_info=True)
+        return False
+
+
 def main():
     """
     Main function to run race/ethnicity inference using pyethnicity.
@@ -307,12 +336,7 @@ About pyethnicity:
         logger.error(f"Database file not found: {db_path}")
         return 1
 
-    try:
-        infer_ethnicity_in_duckdb(db_path, batch_size=args.batch_size)
-        return 0
-    except Exception as e:
-        logger.error(f"Fatal error: {e}", exc_info=True)
-        return 1
+    return 0 if run(db_path, batch_size=args.batch_size) else 1
 
 
 if __name__ == '__main__':
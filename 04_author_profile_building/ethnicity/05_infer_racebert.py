@@ -159,6 +159,11 @@ def infer_ethnicity_in_duckdb(db_file, batch_size=100, use_gpu=False):
     """
     logger = logging.getLogger(__name__)
 
+    db_file = Path(db_file)
+
+    if not db_file.exists():
+        raise FileNotFoundError(f"Database file not found: {db_file}")
+
     if not RACEBERT_AVAILABLE:
         logger.error("raceBERT is not available. Cannot proceed.")
         if not PYTORCH_AVAILABLE:
@@ -318,6 +323,35 @@ def infer_ethnicity_in_duckdb(db_file, batch_size=100, use_gpu=False):
     logger.info("="*70)
 
 
+def run(db_path, batch_size=100, use_gpu=False) -> bool:
+    """
+    Run raceBERT inference in the current process.
+
+    Used by main() and by ethnicity_orchestrator.py, which calls it directly
+    instead of starting a new interpreter for each tool.
+
+    Args:
+        db_path (Path): Path to the DuckDB database file
+        batch_size (int): Number of records to process in each batch
+        use_gpu (bool): Run the model on the GPU if available
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    logger = logging.getLogger(__name__)
+
+    if not RACEBERT_AVAILABLE:
+        logger.error("raceBERT is not available - skipping")
+        return False
+
+    try:
+        infer_ethnicity_in_duckdb(db_path, batch_size=batch_size, use_gpu=use_gpu)
+        return True
+    except Exception as e:
+        logger.error(f"Fatal error: {e}", exc_info=True)
+        return False
+
+
 def main():
     """
     Main function to run race/ethnicity inference using raceBERT.
@@ -398,12 +432,7 @@ About raceBERT:
         logger.error(f"Database file not found: {db_path}")
         return 1
 
-    try:
-        infer_ethnicity_in_duckdb(db_path, batch_size=args.batch_size, use_gpu=args.gpu)
-        return 0
-    except Exception as e:
-        logger.error(f"Fatal error: {e}", exc_info=True)
-        return 1
+    return 0 if run(db_path, batch_size=args.batch_size, use_gpu=args.gpu) else 1
 
 
 if __name__ == '__main__':
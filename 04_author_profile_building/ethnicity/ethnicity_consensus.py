@@ -30,8 +30,32 @@ Unified ethnicity categories:
 
 """
 
-from typing import Optional, Dict, Tuple
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Dict, Tuple, Iterable, NamedTuple
 import json
+import re
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+try:
+    import re2
+    RE2_AVAILABLE = True
+except ImportError:
+    RE2_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
 
 
 # Mapping ethnicseer categories to unified categories
@@ -57,6 +81,17 @@ PYETHNICITY_TO_UNIFIED = {
     'hispanic': 'Hispanic/Latino',
     'white': 'European/Caucasian'
 }
+PYETHNICITY_RACES = ('asian', 'black', 'hispanic', 'white')  # column order of the pyethnicity probabilities
+
+# Mapping raceBERT census-style categories to unified categories
+RACEBERT_TO_UNIFIED = {
+    'nh_white': 'European/Caucasian',
+    'nh_black': 'African/African American',
+    'nh_api': 'Asian/Pacific Islander',
+    'nh_aian': 'Native American',
+    'nh_2prace': 'Mixed',
+    'hispanic': 'Hispanic/Latino'
+}
 
 # Mapping ethnidata regions to unified categories
 ETHNIDATA_REGION_TO_UNIFIED = {
@@ -180,6 +215,91 @@ ETHNIDATA_COUNTRY_REFINEMENT = {
     'Gabon': 'Sub-Saharan African',
 }
 
+# Nationality name variations for name2nat, as (unified_category, confidence_factor, priority).
+# When several aliases occur in one nationality string the lowest priority wins.
+NATIONALITY_ALIAS = {
+    'American': ('North American', 0.7, 0),
+    'English': ('European', 0.9, 1),
+    'British': ('European', 0.9, 1),
+    'Japanese': ('East Asian', 1.0, 2),
+    'Korean': ('East Asian', 1.0, 3),
+    'Indian': ('South Asian', 1.0, 4),
+    'French': ('European', 1.0, 5),
+    'German': ('European', 1.0, 5),
+    'Italian': ('European', 1.0, 5)
+}
+# One alternation over all aliases; RE2 (when installed) compiles it to a DFA
+# so a scan is a single linear pass regardless of the number of aliases
+_NAT_RE = (re2 if RE2_AVAILABLE else re).compile('|'.join(NATIONALITY_ALIAS))
+
+# Fixed ordering of every unified category produced by the mappings above,
+# so that categories can be referred to by integer index
+UNIFIED_CATEGORIES = (
+    'East Asian',
+    'South Asian',
+    'Southeast Asian',
+    'Middle Eastern/North African',
+    'Hispanic/Latino',
+    'European',
+    'Sub-Saharan African',
+    'Asian',
+    'African/African American',
+    'European/Caucasian',
+    'African',
+    'Oceanian',
+    'North American',
+    'Asian/Pacific Islander',
+    'Native American',
+    'Mixed'
+)
+UNIFIED_CAT_ID = {category: i for i, category in enumerate(UNIFIED_CATEGORIES)}
+
+# Interned country ids and a flat country id -> unified category index table
+COUNTRY_ID = {country: i for i, country in enumerate(ETHNIDATA_COUNTRY_REFINEMENT)}
+COUNTRY_TO_CAT = np.array(
+    [UNIFIED_CAT_ID[category] for category in ETHNIDATA_COUNTRY_REFINEMENT.values()],
+    dtype=np.int8
+)
+
+# Integer-indexed versions of the tool mappings, used by the JIT kernel
+N_CATEGORIES = len(UNIFIED_CATEGORIES)
+COUNTRY_CAT_ID = {country: UNIFIED_CAT_ID[cat] for country, cat in ETHNIDATA_COUNTRY_REFINEMENT.items()}
+ETHNICSEER_CAT_ID = {code: UNIFIED_CAT_ID[cat] for code, cat in ETHNICSEER_TO_UNIFIED.items()}
+RACEBERT_CAT_ID = {race: UNIFIED_CAT_ID[cat] for race, cat in RACEBERT_TO_UNIFIED.items()}
+REGION_CAT_ID = {
+    region: (UNIFIED_CAT_ID[cat] if cat else -1)
+    for region, cat in ETHNIDATA_REGION_TO_UNIFIED.items()
+}
+PYETH_IDX_TO_UNIFIED = np.array(
+    [UNIFIED_CAT_ID[PYETHNICITY_TO_UNIFIED[race]] for race in PYETHNICITY_RACES],
+    dtype=np.int8
+)
+
+# Tool order used by the weight table and the JIT kernel
+TOOL_NAMES = ('ethnicseer', 'pyethnicity', 'ethnidata', 'name2nat', 'racebert')
+TOOL_ID = {tool: i for i, tool in enumerate(TOOL_NAMES)}
+
+BASE_TOOL_WEIGHTS = {
+    'ethnicseer': 1.2,      # High quality, 12 ethnic categories, 84% accuracy
+    'pyethnicity': 1.0,     # Good for US names, US-centric categories
+    'ethnidata': 0.8,       # Granular nationality data, but needs mapping
+    'name2nat': 0.9,        # Global, 254 nationalities, 55% top-1 accuracy
+    'racebert': 1.3         # State-of-the-art, 86% f1-score, transformer-based
+}
+
+# (tool_id, category_id) -> weight, with the ethnicity-specific boosts applied once
+TOOL_WEIGHT_TABLE = np.array(
+    [[BASE_TOOL_WEIGHTS[tool]] * N_CATEGORIES for tool in TOOL_NAMES],
+    dtype=np.float32
+)
+# Boost pyethnicity for African American (unique category)
+TOOL_WEIGHT_TABLE[TOOL_ID['pyethnicity'], UNIFIED_CAT_ID['African/African American']] *= 1.3
+# Boost ethnidata for specific regional predictions
+TOOL_WEIGHT_TABLE[TOOL_ID['ethnidata'], UNIFIED_CAT_ID['Middle Eastern/North African']] *= 1.2
+TOOL_WEIGHT_TABLE[TOOL_ID['ethnidata'], UNIFIED_CAT_ID['Sub-Saharan African']] *= 1.2
+# Plain-float copy for the pure-Python path
+TOOL_WEIGHT_ROWS = TOOL_WEIGHT_TABLE.tolist()
+
 
 def get_tool_weight(tool_name: str, ethnicity: Optional[str] = None) -> float:
     """
@@ -192,25 +312,48 @@ def get_tool_weight(tool_name: str, ethnicity: Optional[str] = None) -> float:
     Returns:
         float: Weight for this tool's prediction
     """
-    base_weights = {
-        'ethnicseer': 1.2,      # High quality, 12 ethnic categories, 84% accuracy
-        'pyethnicity': 1.0,     # Good for US names, US-centric categories
-        'ethnidata': 0.8,       # Granular nationality data, but needs mapping
-        'name2nat': 0.9,        # Global, 254 nationalities, 55% top-1 accuracy
-        'racebert': 1.3         # State-of-the-art, 86% f1-score, transformer-based
-    }
+    tool_id = TOOL_ID.get(tool_name)
+    if tool_id is None:
+        return 1.0
 
-    weight = base_weights.get(tool_name, 1.0)
+    cat = UNIFIED_CAT_ID.get(ethnicity)
+    if cat is None:
+        return BASE_TOOL_WEIGHTS[tool_name]
 
-    # Boost pyethnicity for African American (unique category)
-    if tool_name == 'pyethnicity' and ethnicity == 'African/African American':
-        weight *= 1.3
+    return TOOL_WEIGHT_ROWS[tool_id][cat]
 
-    # Boost ethnidata for specific regional predictions
-    if tool_name == 'ethnidata' and ethnicity in ['Middle Eastern/North African', 'Sub-Saharan African']:
-        weight *= 1.2
 
-    return weight
+def pyethnicity_category_ids(probs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce pyethnicity probabilities to one (category, probability) vote per row.
+
+    Args:
+        probs: (N, 4) float32 array in the order asian, black, hispanic, white
+            (missing probabilities set to -1)
+
+    Returns:
+        Tuple of (int8 category indices, -1 below the 0.5 threshold;
+        float32 winning probabilities)
+    """
+    rows = np.arange(probs.shape[0])
+    idx = probs.argmax(axis=1)
+    max_prob = probs[rows, idx]
+    cat_idx = np.where(max_prob >= 0.5, PYETH_IDX_TO_UNIFIED[idx], -1).astype(np.int8)
+    return cat_idx, max_prob.astype(np.float32)
+
+
+def country_category_ids(countries: Iterable[Optional[str]]) -> np.ndarray:
+    """
+    Map a column of country names to unified category indices in one pass.
+
+    Args:
+        countries: Iterable of country names (None or unknown names allowed)
+
+    Returns:
+        np.ndarray: int8 array of indices into UNIFIED_CATEGORIES (-1 if unmapped)
+    """
+    ids = np.fromiter((COUNTRY_ID.get(c, -1) for c in countries), dtype=np.int16)
+    return np.where(ids >= 0, COUNTRY_TO_CAT[ids], -1).astype(np.int8)
 
 
 def map_ethnicseer_to_unified(ethnicity: str, confidence: float) -> Tuple[Optional[str], float]:
@@ -270,13 +413,14 @@ def map_ethnidata_to_unified(country: Optional[str], region: Optional[str],
         return (None, 0.0)
 
     # First try country-specific mapping
-    if country and country in ETHNIDATA_COUNTRY_REFINEMENT:
-        return (ETHNIDATA_COUNTRY_REFINEMENT[country], confidence)
+    unified = ETHNIDATA_COUNTRY_REFINEMENT.get(country)
+    if unified is not None:
+        return (unified, confidence)
 
     # Fall back to region mapping
-    if region and region in ETHNIDATA_REGION_TO_UNIFIED:
-        unified = ETHNIDATA_REGION_TO_UNIFIED[region]
-        return (unified, confidence * 0.7) if unified else (None, 0.0)  # Lower confidence for region-only
+    unified = ETHNIDATA_REGION_TO_UNIFIED.get(region)
+    if unified is not None:
+        return (unified, confidence * 0.7)  # Lower confidence for region-only
 
     return (None, 0.0)
 
@@ -297,22 +441,14 @@ def map_name2nat_to_unified(nationality: Optional[str], probability: Optional[fl
 
     # Map nationality to unified categories using ethnidata country mapping
     unified = ETHNIDATA_COUNTRY_REFINEMENT.get(nationality)
-    if unified:
+    if unified is not None:
         return (unified, probability)
 
-    # Try common nationality name variations
-    if 'American' in nationality:
-        return ('North American', probability * 0.7)
-    elif 'English' in nationality or 'British' in nationality:
-        return ('European', probability * 0.9)
-    elif 'Japanese' in nationality:
-        return ('East Asian', probability)
-    elif 'Korean' in nationality:
-        return ('East Asian', probability)
-    elif 'Indian' in nationality:
-        return ('South Asian', probability)
-    elif 'French' in nationality or 'German' in nationality or 'Italian' in nationality:
-        return ('European', probability)
+    # Try common nationality name variations in a single scan
+    matches = _NAT_RE.findall(nationality)
+    if matches:
+        unified, factor, _ = min((NATIONALITY_ALIAS[m] for m in matches), key=lambda alias: alias[2])
+        return (unified, probability * factor)
 
     return (None, 0.0)
 
@@ -331,18 +467,584 @@ def map_racebert_to_unified(race: Optional[str], score: Optional[float]) -> Tupl
     if not race or not score:
         return (None, 0.0)
 
-    # raceBERT uses census-style categories
-    racebert_mapping = {
-        'nh_white': 'European/Caucasian',
-        'nh_black': 'African/African American',
-        'nh_api': 'Asian/Pacific Islander',
-        'nh_aian': 'Native American',
-        'nh_2prace': 'Mixed',
-        'hispanic': 'Hispanic/Latino'
+    unified = RACEBERT_TO_UNIFIED.get(race)
+    return (unified, score) if unified else (None, 0.0)
+
+
+def _consensus_numba(eth_idx, eth_conf, py_idx, py_prob, ed_country_idx, ed_region_idx, ed_conf,
+                     n2n_idx, n2n_prob, rb_idx, rb_score, votes, present):
+    """
+    Accumulate weighted votes for one author over integer category indices.
+
+    Category arguments are indices into UNIFIED_CATEGORIES (-1 when the tool
+    gave no usable prediction); pyethnicity arrives already reduced by
+    pyethnicity_category_ids.
+    Votes are written into the float32 `votes` and bool `present` buffers
+    (length N_CATEGORIES).
+
+    Returns:
+        Tuple of (best_category_index, confidence); index is -1 if no votes
+    """
+    votes[:] = 0.0
+    present[:] = False
+
+    if eth_idx >= 0:
+        votes[eth_idx] += TOOL_WEIGHT_TABLE[0, eth_idx] * eth_conf
+        present[eth_idx] = True
+
+    if py_idx >= 0:
+        votes[py_idx] += TOOL_WEIGHT_TABLE[1, py_idx] * py_prob
+        present[py_idx] = True
+
+    if ed_country_idx >= 0:
+        votes[ed_country_idx] += TOOL_WEIGHT_TABLE[2, ed_country_idx] * ed_conf
+        present[ed_country_idx] = True
+    elif ed_region_idx >= 0:
+        votes[ed_region_idx] += TOOL_WEIGHT_TABLE[2, ed_region_idx] * ed_conf * 0.7
+        present[ed_region_idx] = True
+
+    if n2n_idx >= 0:
+        votes[n2n_idx] += TOOL_WEIGHT_TABLE[3, n2n_idx] * n2n_prob
+        present[n2n_idx] = True
+
+    if rb_idx >= 0:
+        votes[rb_idx] += TOOL_WEIGHT_TABLE[4, rb_idx] * rb_score
+        present[rb_idx] = True
+
+    # Compare-and-select over the fixed-K vote vector (lowers to cmov); categories
+    # without a vote are masked to -1 so they can never win
+    best = -1
+    best_votes = np.float32(-1.0)
+    total = np.float32(0.0)
+    for k in range(N_CATEGORIES):
+        v = votes[k]
+        total += v
+        cand = v if present[k] else np.float32(-1.0)
+        take = cand > best_votes
+        best = k if take else best
+        best_votes = cand if take else best_votes
+
+    if best < 0 or total <= 0.0:
+        return best, np.float32(0.0)
+    return best, np.float32(best_votes / total)
+
+
+if NUMBA_AVAILABLE:
+    _consensus_numba = njit(cache=True, fastmath=True)(_consensus_numba)
+
+
+def _consensus_batch_numba(eth_idx, eth_conf, py_idx, py_prob, ed_country_idx, ed_region_idx, ed_conf,
+                           n2n_idx, n2n_prob, rb_idx, rb_score,
+                           out_cat, out_conf, out_votes, out_present):
+    """
+    Run the consensus kernel over N authors, one independent row per iteration.
+
+    Inputs are length-N columns in the same encoding as _consensus_numba.
+    Results are written into the pre-allocated
+    out_cat (N,), out_conf (N,), out_votes (N, K) and out_present (N, K) arrays.
+    """
+    for i in prange(eth_idx.shape[0]):
+        best, confidence = _consensus_numba(
+            eth_idx[i], eth_conf[i], py_idx[i], py_prob[i],
+            ed_country_idx[i], ed_region_idx[i], ed_conf[i],
+            n2n_idx[i], n2n_prob[i], rb_idx[i], rb_score[i],
+            out_votes[i], out_present[i]
+        )
+        out_cat[i] = best
+        out_conf[i] = confidence
+
+
+if NUMBA_AVAILABLE:
+    _consensus_batch_numba = njit(parallel=True, cache=True)(_consensus_batch_numba)
+
+
+def _consensus_batch_numpy(eth_idx, eth_conf, py_idx, py_prob, ed_country_idx, ed_region_idx, ed_conf,
+                           n2n_idx, n2n_prob, rb_idx, rb_score,
+                           out_cat, out_conf, out_votes, out_present):
+    """
+    Column-at-a-time NumPy version of _consensus_batch_numba, used when numba
+    is not installed. Same arguments and outputs.
+    """
+    rows = np.arange(eth_idx.shape[0])
+    out_votes[:] = 0.0
+    out_present[:] = False
+
+    # ethnidata falls back to its region (at 70% confidence) when the country is unmapped
+    has_country = ed_country_idx >= 0
+    ed_idx = np.where(has_country, ed_country_idx, ed_region_idx)
+    ed_conf = np.where(has_country, ed_conf, ed_conf * np.float32(0.7))
+
+    tool_votes = (
+        (0, eth_idx, eth_conf),
+        (1, py_idx, py_prob),
+        (2, ed_idx, ed_conf),
+        (3, n2n_idx, n2n_prob),
+        (4, rb_idx, rb_score),
+    )
+    for tool, cat_idx, score in tool_votes:
+        voted = cat_idx >= 0
+        r, c = rows[voted], cat_idx[voted]
+        # At most one vote per row per tool, so (r, c) pairs are unique
+        out_votes[r, c] += TOOL_WEIGHT_TABLE[tool, c] * score[voted]
+        out_present[r, c] = True
+
+    masked = np.where(out_present, out_votes, np.float32(-1.0))
+    best = masked.argmax(axis=1)
+    best_votes = masked[rows, best]
+    total = out_votes.sum(axis=1)
+
+    out_cat[:] = np.where(best_votes >= 0, best, -1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out_conf[:] = np.where((best_votes >= 0) & (total > 0), best_votes / total, 0.0)
+
+
+_consensus_batch = _consensus_batch_numba if NUMBA_AVAILABLE else _consensus_batch_numpy
+
+
+@dataclass
+class ConsensusInputs:
+    """
+    Column-oriented predictions for a batch of N authors.
+
+    Field names follow the calculate_consensus arguments. String columns are
+    object arrays (None when missing), numeric columns are float32 arrays
+    (NaN when missing), and pyethnicity_probs has shape (N, 4) in the order
+    asian, black, hispanic, white.
+    """
+    ethnicseer_ethnicity: np.ndarray
+    ethnicseer_confidence: np.ndarray
+    pyethnicity_probs: np.ndarray
+    ethnidata_country: np.ndarray
+    ethnidata_region: np.ndarray
+    ethnidata_confidence: np.ndarray
+    name2nat_nationality: np.ndarray
+    name2nat_probability: np.ndarray
+    racebert_race: np.ndarray
+    racebert_score: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ethnicseer_ethnicity)
+
+    @classmethod
+    def from_dataframe(cls, df) -> 'ConsensusInputs':
+        """
+        Build inputs from a DataFrame whose columns are named like the
+        calculate_consensus arguments, narrowing dtypes once.
+
+        Args:
+            df: pandas DataFrame with one row per author
+
+        Returns:
+            ConsensusInputs
+        """
+        def strings(column):
+            values = df[column]
+            return values.astype(object).where(values.notna(), None).to_numpy()
+
+        def floats(column):
+            return df[column].to_numpy(dtype=np.float32, na_value=np.nan)
+
+        return cls(
+            ethnicseer_ethnicity=strings('ethnicseer_ethnicity'),
+            ethnicseer_confidence=floats('ethnicseer_confidence'),
+            pyethnicity_probs=np.column_stack([
+                floats('pyethnicity_asian'),
+                floats('pyethnicity_black'),
+                floats('pyethnicity_hispanic'),
+                floats('pyethnicity_white')
+            ]).astype(np.float32).reshape(len(df), 4),
+            ethnidata_country=strings('ethnidata_country'),
+            ethnidata_region=strings('ethnidata_region'),
+            ethnidata_confidence=floats('ethnidata_confidence'),
+            name2nat_nationality=strings('name2nat_nationality'),
+            name2nat_probability=floats('name2nat_probability'),
+            racebert_race=strings('racebert_race'),
+            racebert_score=floats('racebert_score')
+        )
+
+
+def _as_float32(values: np.ndarray, nan: float) -> np.ndarray:
+    """
+    Return a contiguous float32 copy of a column with NaNs replaced.
+    """
+    return np.ascontiguousarray(np.nan_to_num(values.astype(np.float32), nan=nan))
+
+
+def _category_ids(values: np.ndarray, mapping: Dict[str, int]) -> np.ndarray:
+    """
+    Map a column of codes to unified category indices (-1 if unmapped).
+    """
+    return np.fromiter((mapping.get(v, -1) for v in values), dtype=np.int8, count=len(values))
+
+
+def _name2nat_category_ids(nationalities: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Map name2nat nationalities to (category index, confidence factor) columns,
+    resolving each distinct nationality string only once.
+    """
+    resolved = {}
+    idx = np.full(len(nationalities), -1, dtype=np.int8)
+    factor = np.zeros(len(nationalities), dtype=np.float32)
+
+    for i, nationality in enumerate(nationalities):
+        if not nationality:
+            continue
+        hit = resolved.get(nationality)
+        if hit is None:
+            unified, conf = map_name2nat_to_unified(nationality, 1.0)
+            hit = resolved[nationality] = (UNIFIED_CAT_ID[unified], conf) if unified else (-1, 0.0)
+        idx[i], factor[i] = hit
+
+    return idx, factor
+
+
+def votes_to_dict(vote_percentages: np.ndarray) -> Dict[str, float]:
+    """
+    Convert one row of batch vote percentages back to a {category: percent} dict.
+
+    Args:
+        vote_percentages: Length-K row from calculate_consensus_batch (NaN = no vote)
+
+    Returns:
+        Dict of the categories that received a vote
+    """
+    return {
+        UNIFIED_CATEGORIES[k]: float(vote_percentages[k])
+        for k in np.flatnonzero(~np.isnan(vote_percentages))
     }
 
-    unified = racebert_mapping.get(race)
-    return (unified, score) if unified else (None, 0.0)
+
+class ConsensusResult(NamedTuple):
+    """
+    Consensus for one author.
+
+    Unpacks like the old (consensus, confidence, votes) tuple, but votes_pct is
+    a read-only float32 vector aligned with UNIFIED_CATEGORIES (NaN where a
+    category received no vote) instead of a dict.
+    """
+    consensus: Optional[str]
+    confidence: float
+    votes_pct: np.ndarray
+
+    def to_dict(self) -> Dict[str, float]:
+        """
+        Return the vote percentages as a {category: percent} dict.
+        """
+        return votes_to_dict(self.votes_pct)
+
+
+def _frozen(votes_pct: np.ndarray) -> np.ndarray:
+    votes_pct.flags.writeable = False
+    return votes_pct
+
+
+NO_CONSENSUS = ConsensusResult(None, 0.0, _frozen(np.full(N_CATEGORIES, np.nan, dtype=np.float32)))
+
+
+def calculate_consensus_batch(inputs: ConsensusInputs) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calculate consensus ethnicity for a whole batch of authors column-at-a-time.
+
+    Args:
+        inputs: ConsensusInputs for N authors
+
+    Returns:
+        Tuple of (consensus, confidence, vote_percentages):
+            - consensus: object array of unified categories (None if no votes)
+            - confidence: float array of normalized winning weights
+            - vote_percentages: (N, K) array aligned with UNIFIED_CATEGORIES,
+              NaN where a category received no vote
+    """
+    n2n_idx, n2n_factor = _name2nat_category_ids(inputs.name2nat_nationality)
+    return _consensus_from_ids(
+        _category_ids(inputs.ethnicseer_ethnicity, ETHNICSEER_CAT_ID), inputs.ethnicseer_confidence,
+        inputs.pyethnicity_probs,
+        country_category_ids(inputs.ethnidata_country),
+        _category_ids(inputs.ethnidata_region, REGION_CAT_ID), inputs.ethnidata_confidence,
+        n2n_idx, n2n_factor, inputs.name2nat_probability,
+        _category_ids(inputs.racebert_race, RACEBERT_CAT_ID), inputs.racebert_score
+    )
+
+
+def _consensus_from_ids(eth_idx, eth_conf, py_probs, ed_country_idx, ed_region_idx, ed_conf,
+                        n2n_idx, n2n_factor, n2n_prob, rb_idx, rb_score
+                        ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Apply the per-tool defaults and thresholds to encoded columns and run the
+    batch kernel. Returns the same tuple as calculate_consensus_batch.
+    """
+    n = len(eth_idx)
+
+    eth_conf = _as_float32(eth_conf, nan=0.0)
+    eth_conf[eth_conf == 0.0] = 1.0
+
+    py_idx, py_prob = pyethnicity_category_ids(_as_float32(py_probs, nan=-1.0))
+
+    ed_conf = _as_float32(ed_conf, nan=0.0)
+
+    n2n_prob = _as_float32(n2n_prob, nan=0.0)
+    n2n_idx[n2n_prob == 0.0] = -1
+
+    rb_score = _as_float32(rb_score, nan=0.0)
+    rb_idx[rb_score == 0.0] = -1
+
+    out_cat = np.empty(n, dtype=np.int8)
+    out_conf = np.empty(n, dtype=np.float32)
+    out_votes = np.empty((n, N_CATEGORIES), dtype=np.float32)
+    out_present = np.empty((n, N_CATEGORIES), dtype=np.bool_)
+
+    _consensus_batch(
+        eth_idx, eth_conf, py_idx, py_prob,
+        ed_country_idx, ed_region_idx, ed_conf,
+        n2n_idx, n2n_prob * n2n_factor, rb_idx, rb_score,
+        out_cat, out_conf, out_votes, out_present
+    )
+
+    totals = out_votes.sum(axis=1, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        vote_percentages = np.where(totals > 0, out_votes / totals * 100, 0.0)
+    vote_percentages[~out_present] = np.nan
+
+    labels = np.array(UNIFIED_CATEGORIES + (None,), dtype=object)
+    return labels[out_cat], out_conf, vote_percentages
+
+
+def _arrow_encode(column, encode):
+    """
+    Encode a string column through `encode` (object array -> array or tuple
+    of arrays). Dictionary-encoded columns only encode their dictionary and
+    gather the result through the indices, so each distinct string is
+    looked up once.
+    """
+    column = column.combine_chunks() if isinstance(column, pa.ChunkedArray) else column
+    if not pa.types.is_dictionary(column.type):
+        return encode(column.to_numpy(zero_copy_only=False))
+
+    # A trailing None entry gives null indices somewhere to point
+    dictionary = np.append(column.dictionary.to_numpy(zero_copy_only=False), None)
+    indices = column.indices.fill_null(len(column.dictionary)).to_numpy()
+    encoded = encode(dictionary)
+    if isinstance(encoded, tuple):
+        return tuple(values[indices] for values in encoded)
+    return encoded[indices]
+
+
+def _arrow_floats(column) -> np.ndarray:
+    """
+    Return a numeric column as float32 with nulls as NaN (zero-copy when the
+    column is already null-free float32).
+    """
+    column = column.combine_chunks() if isinstance(column, pa.ChunkedArray) else column
+    return column.cast(pa.float32()).to_numpy(zero_copy_only=False)
+
+
+def calculate_consensus_arrow(table: 'pa.Table') -> 'pa.Table':
+    """
+    Calculate consensus ethnicity for an Arrow table of tool outputs.
+
+    Columns are named like the calculate_consensus arguments. String columns
+    may be dictionary-encoded, in which case category mapping runs over the
+    dictionary only.
+
+    Args:
+        table: pyarrow Table with one row per author
+
+    Returns:
+        pyarrow Table with consensus_ethnicity, consensus_ethnicity_confidence
+        and consensus_ethnicity_votes (fixed-size list aligned with
+        UNIFIED_CATEGORIES, null where a category received no vote)
+    """
+    if not PYARROW_AVAILABLE:
+        raise ImportError("pyarrow is required for calculate_consensus_arrow")
+
+    table = table.unify_dictionaries()
+    column = table.column
+
+    n2n_idx, n2n_factor = _arrow_encode(column('name2nat_nationality'), _name2nat_category_ids)
+    consensus, confidence, vote_percentages = _consensus_from_ids(
+        _arrow_encode(column('ethnicseer_ethnicity'), lambda v: _category_ids(v, ETHNICSEER_CAT_ID)),
+        _arrow_floats(column('ethnicseer_confidence')),
+        np.column_stack([
+            _arrow_floats(column('pyethnicity_asian')),
+            _arrow_floats(column('pyethnicity_black')),
+            _arrow_floats(column('pyethnicity_hispanic')),
+            _arrow_floats(column('pyethnicity_white'))
+        ]).reshape(table.num_rows, 4),
+        _arrow_encode(column('ethnidata_country'), country_category_ids),
+        _arrow_encode(column('ethnidata_region'), lambda v: _category_ids(v, REGION_CAT_ID)),
+        _arrow_floats(column('ethnidata_confidence')),
+        n2n_idx, n2n_factor, _arrow_floats(column('name2nat_probability')),
+        _arrow_encode(column('racebert_race'), lambda v: _category_ids(v, RACEBERT_CAT_ID)),
+        _arrow_floats(column('racebert_score'))
+    )
+
+    return pa.table({
+        'consensus_ethnicity': pa.array(consensus, type=pa.string()),
+        'consensus_ethnicity_confidence': pa.array(confidence),
+        'consensus_ethnicity_votes': pa.FixedSizeListArray.from_arrays(
+            pa.array(vote_percentages.ravel().astype(np.float32), from_pandas=True), N_CATEGORIES
+        )
+    })
+
+
+def _calculate_consensus_jit(
+    ethnicseer_ethnicity, ethnicseer_confidence,
+    pyethnicity_asian, pyethnicity_black, pyethnicity_hispanic, pyethnicity_white,
+    ethnidata_country, ethnidata_region, ethnidata_confidence,
+    name2nat_nationality, name2nat_probability,
+    racebert_race, racebert_score
+) -> ConsensusResult:
+    """
+    Encode one author's predictions as integers and run the JIT consensus kernel.
+
+    Same arguments and return value as calculate_consensus.
+    """
+    eth_idx = ETHNICSEER_CAT_ID.get(ethnicseer_ethnicity, -1)
+
+    py_idx, py_prob = pyethnicity_category_ids(np.array([[
+        -1.0 if p is None else p
+        for p in (pyethnicity_asian, pyethnicity_black, pyethnicity_hispanic, pyethnicity_white)
+    ]], dtype=np.float32))
+
+    ed_country_idx = COUNTRY_CAT_ID.get(ethnidata_country, -1)
+    ed_region_idx = REGION_CAT_ID.get(ethnidata_region, -1)
+
+    n2n_idx = -1
+    n2n_prob = 0.0
+    if name2nat_nationality:
+        unified, n2n_prob = map_name2nat_to_unified(name2nat_nationality, name2nat_probability or 0.0)
+        if unified:
+            n2n_idx = UNIFIED_CAT_ID[unified]
+
+    rb_idx = RACEBERT_CAT_ID.get(racebert_race, -1) if racebert_score else -1
+
+    votes = np.zeros(N_CATEGORIES, dtype=np.float32)
+    present = np.zeros(N_CATEGORIES, dtype=np.bool_)
+    best, confidence = _consensus_numba(
+        eth_idx, ethnicseer_confidence or 1.0, int(py_idx[0]), float(py_prob[0]),
+        ed_country_idx, ed_region_idx, ethnidata_confidence or 0.0,
+        n2n_idx, float(n2n_prob), rb_idx, float(racebert_score or 0.0),
+        votes, present
+    )
+
+    if best < 0:
+        return NO_CONSENSUS
+
+    total_weight = votes.sum()
+    if total_weight > 0:
+        votes *= 100 / total_weight
+    votes[~present] = np.nan
+
+    return ConsensusResult(UNIFIED_CATEGORIES[best], float(confidence), _frozen(votes))
+
+
+def _vote_ethnicseer(args: tuple) -> Tuple[Optional[str], float]:
+    return map_ethnicseer_to_unified(args[0], args[1] or 1.0)
+
+
+def _vote_pyethnicity(args: tuple) -> Tuple[Optional[str], float]:
+    # Same rule as map_pyethnicity_to_unified, compared in place without a dict
+    best_race, best_prob = None, None
+    for race, prob in zip(PYETHNICITY_RACES, args[2:6]):
+        if prob is not None and (best_prob is None or prob > best_prob):
+            best_race, best_prob = race, prob
+
+    if best_race is None or best_prob < 0.5:
+        return (None, 0.0)
+    return (PYETHNICITY_TO_UNIFIED[best_race], best_prob)
+
+
+def _vote_ethnidata(args: tuple) -> Tuple[Optional[str], float]:
+    return map_ethnidata_to_unified(args[6], args[7], args[8] or 0.0)
+
+
+def _vote_name2nat(args: tuple) -> Tuple[Optional[str], float]:
+    return map_name2nat_to_unified(args[9], args[10] or 0.0)
+
+
+def _vote_racebert(args: tuple) -> Tuple[Optional[str], float]:
+    return map_racebert_to_unified(args[11], args[12] or 0.0)
+
+
+# (tool_id, voter) in TOOL_NAMES order; bit i of a presence mask selects entry i
+_TOOL_VOTERS = (
+    (TOOL_ID['ethnicseer'], _vote_ethnicseer),
+    (TOOL_ID['pyethnicity'], _vote_pyethnicity),
+    (TOOL_ID['ethnidata'], _vote_ethnidata),
+    (TOOL_ID['name2nat'], _vote_name2nat),
+    (TOOL_ID['racebert'], _vote_racebert),
+)
+
+# Presence mask -> only the voters for tools that produced output, built once
+_SPECIALIZED = tuple(
+    tuple(entry for bit, entry in enumerate(_TOOL_VOTERS) if mask >> bit & 1)
+    for mask in range(1 << len(_TOOL_VOTERS))
+)
+
+
+def _presence_mask(args: tuple) -> int:
+    """
+    Bitmask of the tools that produced any output for this author.
+    """
+    return (
+        bool(args[0])
+        | (args[2] is not None or args[3] is not None or args[4] is not None or args[5] is not None) << 1
+        | bool(args[6] or args[7]) << 2
+        | bool(args[9]) << 3
+        | bool(args[11]) << 4
+    )
+
+
+def _calculate_consensus_python(*args) -> ConsensusResult:
+    """
+    Pure-Python consensus used when numba is not available.
+
+    Takes the calculate_consensus arguments positionally and returns the same
+    value. Only the voters for tools present in the input are run.
+    """
+    votes = [0.0] * N_CATEGORIES  # category index -> weight
+    present = [False] * N_CATEGORIES
+
+    for tool_id, voter in _SPECIALIZED[_presence_mask(args)]:
+        unified, conf = voter(args)
+        if unified:
+            cat = UNIFIED_CAT_ID[unified]
+            votes[cat] += TOOL_WEIGHT_ROWS[tool_id][cat] * conf
+            present[cat] = True
+
+    voted = [k for k in range(N_CATEGORIES) if present[k]]
+
+    # If no valid predictions, return None
+    if not voted:
+        return NO_CONSENSUS
+
+    # Find consensus (highest weighted vote, lowest index on ties as in the kernel)
+    best = max(voted, key=votes.__getitem__)
+
+    # Calculate confidence as normalized weight
+    total_weight = sum(votes)
+    confidence = votes[best] / total_weight if total_weight > 0 else 0.0
+
+    # Normalize votes to percentages for reporting
+    vote_percentages = np.full(N_CATEGORIES, np.nan, dtype=np.float32)
+    vote_percentages[voted] = [
+        votes[k] / total_weight * 100 if total_weight > 0 else 0.0 for k in voted
+    ]
+
+    return ConsensusResult(UNIFIED_CATEGORIES[best], confidence, _frozen(vote_percentages))
+
+
+CONSENSUS_CACHE_SIZE = 200_000
+
+
+@lru_cache(maxsize=CONSENSUS_CACHE_SIZE)
+def _calculate_consensus_cached(*args) -> ConsensusResult:
+    """
+    Memoized dispatch to the JIT or pure-Python consensus implementation.
+    """
+    if NUMBA_AVAILABLE:
+        return _calculate_consensus_jit(*args)
+    return _calculate_consensus_python(*args)
 
 
 def calculate_consensus(
@@ -359,7 +1061,7 @@ def calculate_consensus(
     name2nat_probability: Optional[float] = None,
     racebert_race: Optional[str] = None,
     racebert_score: Optional[float] = None
-) -> Tuple[Optional[str], float, Dict[str, float]]:
+) -> ConsensusResult:
     """
     Calculate consensus ethnicity from multiple tool predictions.
 
@@ -379,79 +1081,59 @@ def calculate_consensus(
         racebert_score: raceBERT prediction score
 
     Returns:
-        Tuple of (consensus_ethnicity, confidence, vote_weights)
+        ConsensusResult of (consensus_ethnicity, confidence, votes_pct);
+        use .to_dict() for the {category: percent} form
+
+    Results are memoized on the exact inputs. The returned vote vector is
+    shared with the cache and read-only.
     """
-    votes = {}  # ethnicity -> weight
+    return calculate_consensus_row((
+        ethnicseer_ethnicity, ethnicseer_confidence,
+        pyethnicity_asian, pyethnicity_black, pyethnicity_hispanic, pyethnicity_white,
+        ethnidata_country, ethnidata_region, ethnidata_confidence,
+        name2nat_nationality, name2nat_probability,
+        racebert_race, racebert_score
+    ))
 
-    # Process ethnicseer
-    if ethnicseer_ethnicity:
-        unified, conf = map_ethnicseer_to_unified(ethnicseer_ethnicity, ethnicseer_confidence or 1.0)
-        if unified:
-            weight = get_tool_weight('ethnicseer', unified) * conf
-            votes[unified] = votes.get(unified, 0.0) + weight
-
-    # Process pyethnicity
-    race_probs = {}
-    if pyethnicity_asian is not None:
-        race_probs['asian'] = pyethnicity_asian
-    if pyethnicity_black is not None:
-        race_probs['black'] = pyethnicity_black
-    if pyethnicity_hispanic is not None:
-        race_probs['hispanic'] = pyethnicity_hispanic
-    if pyethnicity_white is not None:
-        race_probs['white'] = pyethnicity_white
-
-    if race_probs:
-        unified, conf = map_pyethnicity_to_unified(race_probs)
-        if unified:
-            weight = get_tool_weight('pyethnicity', unified) * conf
-            votes[unified] = votes.get(unified, 0.0) + weight
-
-    # Process ethnidata
-    if ethnidata_country or ethnidata_region:
-        unified, conf = map_ethnidata_to_unified(
-            ethnidata_country,
-            ethnidata_region,
-            ethnidata_confidence or 0.0
-        )
-        if unified:
-            weight = get_tool_weight('ethnidata', unified) * conf
-            votes[unified] = votes.get(unified, 0.0) + weight
 
-    # Process name2nat
-    if name2nat_nationality:
-        unified, conf = map_name2nat_to_unified(name2nat_nationality, name2nat_probability or 0.0)
-        if unified:
-            weight = get_tool_weight('name2nat', unified) * conf
-            votes[unified] = votes.get(unified, 0.0) + weight
+def calculate_consensus_row(row: tuple) -> ConsensusResult:
+    """
+    Positional form of calculate_consensus for per-row loops.
 
-    # Process raceBERT
-    if racebert_race:
-        unified, conf = map_racebert_to_unified(racebert_race, racebert_score or 0.0)
-        if unified:
-            weight = get_tool_weight('racebert', unified) * conf
-            votes[unified] = votes.get(unified, 0.0) + weight
+    Avoids building a keyword dict per call; use it when iterating over
+    database rows, e.g. calculate_consensus_row(row[1:]) to drop author_id.
 
-    # If no valid predictions, return None
-    if not votes:
-        return (None, 0.0, {})
+    Args:
+        row: The 13 calculate_consensus arguments in signature order
 
-    # Find consensus (highest weighted vote)
-    consensus = max(votes, key=votes.get)
+    Returns:
+        ConsensusResult, as from calculate_consensus
+    """
+    return _calculate_consensus_cached(*row)
 
-    # Calculate confidence as normalized weight
-    total_weight = sum(votes.values())
-    confidence = votes[consensus] / total_weight if total_weight > 0 else 0.0
 
-    # Normalize votes to percentages for reporting
-    vote_percentages = {k: (v / total_weight * 100) for k, v in votes.items()}
+def format_votes(votes: Dict[str, float], pretty: bool = False) -> str:
+    """
+    Render a vote-percentage dict for display.
 
-    return (consensus, confidence, vote_percentages)
+    Args:
+        votes: {category: percent} as returned by calculate_consensus
+        pretty: Use indented JSON instead of the compact one-line form
+
+    Returns:
+        str: e.g. "East Asian: 62.4%, Asian: 37.6%"
+    """
+    if pretty:
+        return json.dumps(votes, indent=4)
+    return ', '.join(f"{category}: {percent:.1f}%" for category, percent in votes.items())
 
 
-def main():
+def main(pretty: bool = False):
     """
     Test function to demonstrate consensus calculation.
+
+    Args:
+        pretty: Print votes as indented JSON (only used when run as a script)
     """
     # Example 1: Chinese name
     print("Example 1: Wei Wang (Chinese name)")
@@ -468,7 +1150,7 @@ def main():
     )
     print(f"  Consensus: {consensus}")
     print(f"  Confidence: {confidence:.3f}")
-    print(f"  Votes: {json.dumps(votes, indent=4)}")
+    print(f"  Votes: {format_votes(votes_to_dict(votes), pretty)}")
     print()
 
     # Example 2: Indian name
@@ -486,7 +1168,7 @@ def main():
     )
     print(f"  Consensus: {consensus}")
     print(f"  Confidence: {confidence:.3f}")
-    print(f"  Votes: {json.dumps(votes, indent=4)}")
+    print(f"  Votes: {format_votes(votes_to_dict(votes), pretty)}")
     print()
 
     # Example 3: Hispanic name
@@ -504,9 +1186,9 @@ def main():
     )
     print(f"  Consensus: {consensus}")
     print(f"  Confidence: {confidence:.3f}")
-    print(f"  Votes: {json.dumps(votes, indent=4)}")
+    print(f"  Votes: {format_votes(votes_to_dict(votes), pretty)}")
     print()
 
 
 if __name__ == '__main__':
-    main()
+    main(pretty=True)
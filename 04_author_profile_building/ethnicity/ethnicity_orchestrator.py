@@ -25,16 +25,42 @@ import sys
 from pathlib import Path
 import logging
 from datetime import datetime
+import time
 import argparse
+import importlib
+import json
 import subprocess
 import duckdb
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 SCRIPT_DIR = Path(__file__).parent
 PARENT_DIR = SCRIPT_DIR.parent
 sys.path.insert(0, str(SCRIPT_DIR))
 sys.path.insert(0, str(PARENT_DIR))
 
-from ethnicity_consensus import calculate_consensus
+from ethnicity_consensus import (
+    NUMBA_AVAILABLE,
+    calculate_consensus_arrow,
+    votes_to_dict,
+    map_name2nat_to_unified,
+    ETHNICSEER_TO_UNIFIED,
+    PYETHNICITY_TO_UNIFIED,
+    ETHNIDATA_COUNTRY_REFINEMENT,
+    ETHNIDATA_REGION_TO_UNIFIED,
+    RACEBERT_TO_UNIFIED,
+    UNIFIED_CATEGORIES,
+    TOOL_NAMES,
+    TOOL_WEIGHT_ROWS
+)
+from duckdb_utils import bulk_update, configure_connection, ensure_columns
 
 
 def setup_logging():
@@ -113,6 +139,77 @@ def run_tool(script_name: str, db_path: Path, extra_args: list = None) -> bool:
         return False
 
 
+def run_tool_in_process(script_name: str, db_path: Path) -> bool:
+    """
+    Run an ethnicity inference tool by importing its script and calling run().
+
+    Avoids starting a new interpreter per tool, which re-imports pandas and,
+    for raceBERT, torch and transformers.
+
+    Args:
+        script_name (str): Name of the script to run
+        db_path (Path): Path to the database
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    logger = logging.getLogger(__name__)
+
+    script_path = SCRIPT_DIR / script_name
+
+    if not script_path.exists():
+        logger.warning(f"Script not found: {script_name} - skipping")
+        return False
+
+    logger.info("="*70)
+    logger.info(f"Running: {script_name}")
+    logger.info("="*70)
+
+    try:
+        module = importlib.import_module(script_path.stem)
+    except SystemExit:
+        # Some tool scripts exit at import time when their package is missing
+        logger.error(f"✗ {script_name} could not be loaded: tool package not installed")
+        return False
+    except Exception as e:
+        logger.error(f"✗ {script_name} could not be loaded: {e}")
+        return False
+
+    if module.run(db_path):
+        logger.info(f"✓ {script_name} completed successfully")
+        return True
+
+    logger.error(f"✗ {script_name} failed")
+    return False
+
+
+def votes_to_json(votes: dict) -> str:
+    """
+    Serialize a {category: percent} vote dict as compact JSON text.
+
+    Args:
+        votes (dict): Vote percentages from the consensus calculation
+
+    Returns:
+        str: JSON object text, or '' when there are no votes
+    """
+    if not votes:
+        return ''
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(votes).decode()
+    return json.dumps(votes, separators=(',', ':'))
+
+
+# Batches between progress log lines
+PROGRESS_LOG_BATCHES = 10
+
+CONSENSUS_COLUMNS = {
+    'consensus_ethnicity': 'TEXT',
+    'consensus_ethnicity_confidence': 'DOUBLE',
+    'consensus_ethnicity_votes': 'TEXT',
+}
+
+
 def ensure_consensus_columns(conn):
     """
     Ensure consensus columns exist in the authors table.
@@ -125,34 +222,35 @@ def ensure_consensus_columns(conn):
     """
     logger = logging.getLogger(__name__)
 
-    result = conn.execute("PRAGMA table_info(authors)").fetchall()
-    existing_columns = {row[1] for row in result}
+    ensure_columns(conn, 'authors', CONSENSUS_COLUMNS)
+    logger.info(f"Consensus columns ready: {', '.join(CONSENSUS_COLUMNS)}")
 
-    if 'consensus_ethnicity' not in existing_columns:
-        logger.info("Adding column: consensus_ethnicity (TEXT)")
-        conn.execute("ALTER TABLE authors ADD COLUMN consensus_ethnicity TEXT")
-    else:
-        logger.info("Column already exists: consensus_ethnicity")
 
-    if 'consensus_ethnicity_confidence' not in existing_columns:
-        logger.info("Adding column: consensus_ethnicity_confidence (DOUBLE)")
-        conn.execute("ALTER TABLE authors ADD COLUMN consensus_ethnicity_confidence DOUBLE")
-    else:
-        logger.info("Column already exists: consensus_ethnicity_confidence")
+def consensus_source_filter(force: bool = False) -> str:
+    """
+    WHERE condition selecting the authors whose consensus should be computed.
 
-    if 'consensus_ethnicity_votes' not in existing_columns:
-        logger.info("Adding column: consensus_ethnicity_votes (TEXT)")
-        conn.execute("ALTER TABLE authors ADD COLUMN consensus_ethnicity_votes TEXT")
-    else:
-        logger.info("Column already exists: consensus_ethnicity_votes")
+    Args:
+        force (bool): Recompute every author, not only those without a consensus
+
+    Returns:
+        str: SQL condition on the authors table
+    """
+    if force:
+        return "display_name IS NOT NULL"
+    return (
+        "display_name IS NOT NULL "
+        "AND (consensus_ethnicity IS NULL OR consensus_ethnicity = '')"
+    )
 
 
-def calculate_and_store_consensus(db_path: Path):
+def calculate_and_store_consensus(db_path: Path, force: bool = False):
     """
     Calculate consensus ethnicity from all tool predictions and store in database.
 
     Args:
         db_path (Path): Path to the database
+        force (bool): Recompute authors that already have a consensus
 
     Returns:
         tuple: (total_processed, ethnicity_counts)
@@ -164,10 +262,13 @@ def calculate_and_store_consensus(db_path: Path):
     logger.info("="*70)
 
     conn = duckdb.connect(str(db_path))
+    configure_connection(conn)
 
     ensure_consensus_columns(conn)
 
-    query = """
+    source_filter = consensus_source_filter(force)
+
+    query = f"""
         SELECT
             author_id,
             ethnicseer_ethnicity,
@@ -176,103 +277,312 @@ def calculate_and_store_consensus(db_path: Path):
             pyethnicity_black,
             pyethnicity_hispanic,
             pyethnicity_white,
-            ethnidata_country_name,
+            ethnidata_country_name AS ethnidata_country,
             ethnidata_region,
             ethnidata_confidence,
-            name2nat_nationality1,
-            name2nat_probability1,
+            name2nat_nationality1 AS name2nat_nationality,
+            name2nat_probability1 AS name2nat_probability,
             racebert_race,
-            racebert_race_score
+            racebert_race_score AS racebert_score
         FROM authors
-        WHERE display_name IS NOT NULL
+        WHERE {source_filter}
     """
 
-    logger.info("Fetching author data for consensus calculation...")
-    results = conn.execute(query).fetchall()
-    total_count = len(results)
+    total_count = conn.execute(
+        f"SELECT COUNT(*) FROM authors WHERE {source_filter}"
+    ).fetchone()[0]
     logger.info(f"Processing {total_count:,} authors")
 
+    if NUMBA_AVAILABLE:
+        import numba
+        logger.info(f"Consensus kernel: numba, parallel over {numba.get_num_threads()} threads")
+    else:
+        logger.info("Consensus kernel: NumPy (install numba for the parallel JIT kernel)")
+
     batch_size = 10000
     total_processed = 0
     ethnicity_counts = {}
-    start_time = datetime.now()
+    start_time = time.monotonic()
+
+    # Stream Arrow record batches on a separate cursor so the UPDATEs issued
+    # on conn do not invalidate the open result
+    reader = conn.cursor().execute(query).fetch_record_batch(batch_size)
+
+    for batch_number, batch in enumerate(reader, 1):
+        # Whole-batch consensus over the Arrow columns (column names match
+        # the calculate_consensus arguments via the aliases above)
+        result = calculate_consensus_arrow(pa.Table.from_batches([batch]))
+        consensus = result.column('consensus_ethnicity').to_pylist()
+        confidence = result.column('consensus_ethnicity_confidence').to_numpy()
+        vote_percentages = np.asarray(
+            result.column('consensus_ethnicity_votes').combine_chunks().flatten()
+            .to_numpy(zero_copy_only=False), dtype=np.float32
+        ).reshape(batch.num_rows, -1)
+
+        for label in consensus:
+            if label:
+                ethnicity_counts[label] = ethnicity_counts.get(label, 0) + 1
 
-    for offset in range(0, total_count, batch_size):
-        batch = results[offset:offset + batch_size]
         updates = []
+        for author_id, label, conf, pct in zip(
+            batch.column('author_id').to_pylist(), consensus, confidence.tolist(), vote_percentages
+        ):
+            vote_json = votes_to_json(votes_to_dict(pct))
+            updates.append((label if label else '', conf, vote_json, author_id))
+
+        # One set-based UPDATE per batch instead of one statement per row
+        bulk_update(conn, 'authors', 'author_id', updates, columns=[
+            'consensus_ethnicity', 'consensus_ethnicity_confidence',
+            'consensus_ethnicity_votes', 'author_id'
+        ])
+
+        total_processed += batch.num_rows
+
+        if batch_number % PROGRESS_LOG_BATCHES == 0:
+            elapsed = time.monotonic() - start_time
+            rate = total_processed / elapsed if elapsed > 0 else 0
+            pct_complete = (total_processed / total_count * 100) if total_count > 0 else 0
+
+            logger.info(
+                f"Progress: {total_processed:,}/{total_count:,} ({pct_complete:.1f}%) | "
+                f"Rate: {rate:.0f} records/sec"
+            )
+
+    conn.close()
+
+    total_elapsed = time.monotonic() - start_time
+    avg_rate = total_processed / total_elapsed if total_elapsed > 0 else 0
+
+    logger.info("="*70)
+    logger.info("CONSENSUS CALCULATION COMPLETE")
+    logger.info("="*70)
+    logger.info(f"Total records processed: {total_processed:,}")
+    logger.info("")
+    logger.info("Consensus Ethnicity Distribution:")
+    for ethnicity in sorted(ethnicity_counts.keys()):
+        count = ethnicity_counts[ethnicity]
+        pct = (count / total_processed * 100) if total_processed > 0 else 0
+        logger.info(f"  {ethnicity}: {count:,} ({pct:.2f}%)")
+    logger.info("")
+    logger.info(f"Total time: {total_elapsed:.2f} seconds")
+    logger.info(f"Average rate: {avg_rate:.0f} records/sec")
+    logger.info("="*70)
+
+    return total_processed, ethnicity_counts
+
+
+def register_consensus_mappings(conn):
+    """
+    Register the consensus mapping and weight tables from ethnicity_consensus
+    as DuckDB views, so the SQL consensus uses the same rules as the Python one.
+
+    name2nat nationalities are resolved with map_name2nat_to_unified over the
+    distinct values present in the authors table.
+
+    Args:
+        conn: DuckDB connection object
 
-        for row in batch:
-            (
+    Returns:
+        None
+    """
+    conn.register('consensus_categories', pd.DataFrame(
+        list(enumerate(UNIFIED_CATEGORIES)), columns=['cat_idx', 'category']
+    ))
+    conn.register('consensus_weights', pd.DataFrame(
+        [
+            (tool, category, TOOL_WEIGHT_ROWS[tool_id][cat_idx])
+            for tool_id, tool in enumerate(TOOL_NAMES)
+            for cat_idx, category in enumerate(UNIFIED_CATEGORIES)
+        ],
+        columns=['tool', 'category', 'weight']
+    ))
+    conn.register('ethnicseer_map', pd.DataFrame(
+        list(ETHNICSEER_TO_UNIFIED.items()), columns=['code', 'category']
+    ))
+    conn.register('pyethnicity_map', pd.DataFrame(
+        list(PYETHNICITY_TO_UNIFIED.items()), columns=['race', 'category']
+    ))
+    conn.register('country_map', pd.DataFrame(
+        list(ETHNIDATA_COUNTRY_REFINEMENT.items()), columns=['country', 'category']
+    ))
+    conn.register('region_map', pd.DataFrame(
+        [(region, category) for region, category in ETHNIDATA_REGION_TO_UNIFIED.items() if category],
+        columns=['region', 'category']
+    ))
+    conn.register('racebert_map', pd.DataFrame(
+        list(RACEBERT_TO_UNIFIED.items()), columns=['race', 'category']
+    ))
+
+    name2nat_rows = []
+    for (nationality,) in conn.execute(
+        "SELECT DISTINCT name2nat_nationality1 FROM authors WHERE name2nat_nationality1 IS NOT NULL"
+    ).fetchall():
+        unified, factor = map_name2nat_to_unified(nationality, 1.0)
+        if unified:
+            name2nat_rows.append((nationality, unified, factor))
+    conn.register('name2nat_map', pd.DataFrame(
+        name2nat_rows, columns=['nationality', 'category', 'factor']
+    ).astype({'nationality': object, 'category': object, 'factor': float}))
+
+
+# Same weighted vote as ethnicity_consensus.calculate_consensus, evaluated by
+# DuckDB over the whole table. Authors without any vote get '' / 0.0 / ''.
+SQL_CONSENSUS_UPDATE = """
+    UPDATE authors
+    SET consensus_ethnicity = COALESCE(u.consensus, ''),
+        consensus_ethnicity_confidence = COALESCE(u.confidence, 0.0),
+        consensus_ethnicity_votes = COALESCE(u.votes, '')
+    FROM (
+        WITH src AS (
+            SELECT *
+            FROM authors
+            WHERE {source_filter}
+        ),
+        pyethnicity AS (
+            SELECT
                 author_id,
-                ethnicseer_ethnicity, ethnicseer_confidence,
-                pyethnicity_asian, pyethnicity_black, pyethnicity_hispanic, pyethnicity_white,
-                ethnidata_country, ethnidata_region, ethnidata_confidence,
-                name2nat_nationality, name2nat_probability,
-                racebert_race, racebert_score
-            ) = row
-
-            consensus, confidence, votes = calculate_consensus(
-                ethnicseer_ethnicity=ethnicseer_ethnicity,
-                ethnicseer_confidence=ethnicseer_confidence,
-                pyethnicity_asian=pyethnicity_asian,
-                pyethnicity_black=pyethnicity_black,
-                pyethnicity_hispanic=pyethnicity_hispanic,
-                pyethnicity_white=pyethnicity_white,
-                ethnidata_country=ethnidata_country,
-                ethnidata_region=ethnidata_region,
-                ethnidata_confidence=ethnidata_confidence,
-                name2nat_nationality=name2nat_nationality,
-                name2nat_probability=name2nat_probability,
-                racebert_race=racebert_race,
-                racebert_score=racebert_score
+                max_prob,
+                CASE max_prob
+                    WHEN pyethnicity_asian THEN 'asian'
+                    WHEN pyethnicity_black THEN 'black'
+                    WHEN pyethnicity_hispanic THEN 'hispanic'
+                    WHEN pyethnicity_white THEN 'white'
+                END AS race
+            FROM (
+                SELECT *, GREATEST(pyethnicity_asian, pyethnicity_black,
+                                   pyethnicity_hispanic, pyethnicity_white) AS max_prob
+                FROM src
             )
-
-            if consensus:
-                ethnicity_counts[consensus] = ethnicity_counts.get(consensus, 0) + 1
-
-            vote_json = str(votes) if votes else ''
-            updates.append((consensus if consensus else '', confidence, vote_json, author_id))
-
-        conn.executemany(
-            """
-            UPDATE authors
-            SET consensus_ethnicity = ?,
-                consensus_ethnicity_confidence = ?,
-                consensus_ethnicity_votes = ?
-            WHERE author_id = ?
-            """,
-            updates
+        ),
+        tool_votes AS (
+            SELECT s.author_id, 'ethnicseer' AS tool, m.category,
+                   COALESCE(NULLIF(s.ethnicseer_confidence, 0), 1.0) AS score
+            FROM src s
+            JOIN ethnicseer_map m ON s.ethnicseer_ethnicity = m.code
+
+            UNION ALL
+            SELECT p.author_id, 'pyethnicity', m.category, p.max_prob
+            FROM pyethnicity p
+            JOIN pyethnicity_map m ON p.race = m.race
+            WHERE p.max_prob >= 0.5
+
+            UNION ALL
+            -- Region-only predictions count at 70% confidence
+            SELECT s.author_id, 'ethnidata', COALESCE(c.category, r.category),
+                   COALESCE(s.ethnidata_confidence, 0)
+                       * CASE WHEN c.category IS NULL THEN 0.7 ELSE 1.0 END
+            FROM src s
+            LEFT JOIN country_map c ON s.ethnidata_country_name = c.country
+            LEFT JOIN region_map r ON s.ethnidata_region = r.region
+            WHERE COALESCE(c.category, r.category) IS NOT NULL
+
+            UNION ALL
+            SELECT s.author_id, 'name2nat', m.category, s.name2nat_probability1 * m.factor
+            FROM src s
+            JOIN name2nat_map m ON s.name2nat_nationality1 = m.nationality
+            WHERE s.name2nat_probability1 <> 0
+
+            UNION ALL
+            SELECT s.author_id, 'racebert', m.category, s.racebert_race_score
+            FROM src s
+            JOIN racebert_map m ON s.racebert_race = m.race
+            WHERE s.racebert_race_score <> 0
+        ),
+        votes AS (
+            SELECT author_id, category, cat_idx, vote,
+                   SUM(vote) OVER (PARTITION BY author_id) AS total
+            FROM (
+                SELECT v.author_id, v.category, k.cat_idx, SUM(w.weight * v.score) AS vote
+                FROM tool_votes v
+                JOIN consensus_weights w ON w.tool = v.tool AND w.category = v.category
+                JOIN consensus_categories k ON k.category = v.category
+                GROUP BY ALL
+            )
+        ),
+        consensus AS (
+            SELECT
+                author_id,
+                FIRST(category ORDER BY vote DESC, cat_idx) AS consensus,
+                CASE WHEN ANY_VALUE(total) > 0 THEN MAX(vote) / ANY_VALUE(total) ELSE 0.0 END AS confidence,
+                TO_JSON(MAP(
+                    LIST(category ORDER BY cat_idx),
+                    LIST(CASE WHEN total > 0 THEN vote / total * 100 ELSE 0.0 END ORDER BY cat_idx)
+                ))::TEXT AS votes
+            FROM votes
+            GROUP BY author_id
         )
+        SELECT src.author_id, c.consensus, c.confidence, c.votes
+        FROM src
+        LEFT JOIN consensus c ON src.author_id = c.author_id
+    ) u
+    WHERE authors.author_id = u.author_id
+"""
 
-        total_processed += len(batch)
 
-        elapsed = (datetime.now() - start_time).total_seconds()
-        rate = total_processed / elapsed if elapsed > 0 else 0
-        pct_complete = (total_processed / total_count * 100) if total_count > 0 else 0
+def calculate_and_store_consensus_sql(db_path: Path, force: bool = False):
+    """
+    Calculate consensus ethnicity with a single set-based UPDATE inside DuckDB.
 
-        logger.info(
-            f"Progress: {total_processed:,}/{total_count:,} ({pct_complete:.1f}%) | "
-            f"Rate: {rate:.0f} records/sec"
-        )
+    Produces the same consensus and confidence as calculate_and_store_consensus
+    without moving rows through Python.
+
+    Args:
+        db_path (Path): Path to the database
+        force (bool): Recompute authors that already have a consensus
+
+    Returns:
+        tuple: (total_processed, ethnicity_counts)
+    """
+    logger = logging.getLogger(__name__)
+
+    logger.info("="*70)
+    logger.info("CALCULATING CONSENSUS ETHNICITY (SQL)")
+    logger.info("="*70)
+
+    conn = duckdb.connect(str(db_path))
+    configure_connection(conn)
+
+    ensure_consensus_columns(conn)
+    register_consensus_mappings(conn)
+
+    source_filter = consensus_source_filter(force)
+
+    start_time = time.monotonic()
+    total_processed = conn.execute(
+        f"SELECT COUNT(*) FROM authors WHERE {source_filter}"
+    ).fetchone()[0]
+    logger.info(f"Processing {total_processed:,} authors")
+
+    conn.execute(SQL_CONSENSUS_UPDATE.format(source_filter=source_filter))
+
+    total_authors = conn.execute(
+        "SELECT COUNT(*) FROM authors WHERE display_name IS NOT NULL"
+    ).fetchone()[0]
+    ethnicity_counts = dict(conn.execute(
+        """
+        SELECT consensus_ethnicity, COUNT(*)
+        FROM authors
+        WHERE display_name IS NOT NULL AND consensus_ethnicity <> ''
+        GROUP BY consensus_ethnicity
+        """
+    ).fetchall())
 
     conn.close()
 
-    total_elapsed = (datetime.now() - start_time).total_seconds()
-    avg_rate = total_processed / total_elapsed if total_elapsed > 0 else 0
+    total_elapsed = time.monotonic() - start_time
 
     logger.info("="*70)
     logger.info("CONSENSUS CALCULATION COMPLETE")
     logger.info("="*70)
     logger.info(f"Total records processed: {total_processed:,}")
     logger.info("")
-    logger.info("Consensus Ethnicity Distribution:")
+    logger.info("Consensus Ethnicity Distribution (all authors):")
     for ethnicity in sorted(ethnicity_counts.keys()):
         count = ethnicity_counts[ethnicity]
-        pct = (count / total_processed * 100) if total_processed > 0 else 0
+        pct = (count / total_authors * 100) if total_authors > 0 else 0
         logger.info(f"  {ethnicity}: {count:,} ({pct:.2f}%)")
     logger.info("")
     logger.info(f"Total time: {total_elapsed:.2f} seconds")
-    logger.info(f"Average rate: {avg_rate:.0f} records/sec")
     logger.info("="*70)
 
     return total_processed, ethnicity_counts
@@ -303,6 +613,15 @@ Examples:
   # Only run specific tools
   python ethnicity_orchestrator.py --only ethnicseer ethnidata
 
+  # Compute consensus inside DuckDB instead of in Python
+  python ethnicity_orchestrator.py --sql-consensus
+
+  # Recompute consensus for every author, not only those without one
+  python ethnicity_orchestrator.py --force
+
+  # Run each tool in its own Python process
+  python ethnicity_orchestrator.py --subprocess
+
 Tools:
   - ethnicseer: 12 ethnic categories (Chinese, English, French, German, Indian,
     Italian, Japanese, Korean, Middle-Eastern, Russian, Spanish, Vietnamese)
@@ -355,6 +674,25 @@ Unified Ethnicity Categories:
         help='Only run specific tools (space-separated list)'
     )
 
+    parser.add_argument(
+        '--sql-consensus',
+        action='store_true',
+        help='Calculate consensus with a single DuckDB UPDATE instead of in Python'
+    )
+
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Recompute consensus for all authors (default: only authors without a consensus)'
+    )
+
+    parser.add_argument(
+        '--subprocess',
+        action='store_true',
+        help='Run each tool as a separate Python process instead of in-process '
+             '(isolates crashes in native tool code)'
+    )
+
     args = parser.parse_args()
 
     logger = setup_logging()
@@ -379,7 +717,14 @@ Unified Ethnicity Categories:
     }
 
     results = {}
-    start_time = datetime.now()
+    start_time = time.monotonic()
+
+    # Tools run one after another on purpose. They write disjoint columns,
+    # but each opens the DuckDB file read-write, and DuckDB allows only one
+    # read-write process per database file: concurrent tool processes fail
+    # to acquire the file lock rather than running in parallel. In-process,
+    # concurrent UPDATEs of the same rows abort with write-write conflicts.
+    runner = run_tool if args.subprocess else run_tool_in_process
 
     for tool_name, script_name in tool_scripts.items():
         if only_tools and tool_name not in only_tools:
@@ -390,7 +735,7 @@ Unified Ethnicity Categories:
             logger.info(f"Skipping {tool_name} (in --skip list)")
             continue
 
-        success = run_tool(script_name, db_path)
+        success = runner(script_name, db_path)
         results[tool_name] = success
 
     logger.info("="*70)
@@ -403,13 +748,22 @@ Unified Ethnicity Categories:
 
     logger.info("="*70)
 
+    # Tools rewrite their columns for every author, so existing consensus
+    # values are stale whenever any tool ran in this invocation
+    force = args.force or any(results.values())
+    if not force:
+        logger.info("No tools ran; computing consensus only for authors without one")
+
     try:
-        total, ethnicity_counts = calculate_and_store_consensus(db_path)
+        if args.sql_consensus:
+            total, ethnicity_counts = calculate_and_store_consensus_sql(db_path, force=force)
+        else:
+            total, ethnicity_counts = calculate_and_store_consensus(db_path, force=force)
     except Exception as e:
         logger.error(f"Consensus calculation failed: {e}", exc_info=True)
         return 1
 
-    total_elapsed = (datetime.now() - start_time).total_seconds()
+    total_elapsed = time.monotonic() - start_time
 
     logger.info("="*70)
     logger.info("ORCHESTRATOR COMPLETE")
@@ -16,7 +16,10 @@ import sys
 from pathlib import Path
 import logging
 from datetime import datetime
+import time
+from multiprocessing import Pool
 import argparse
+import os
 import duckdb
 
 # Add parent directory to path for genderComputer import
@@ -24,8 +27,46 @@ SCRIPT_DIR = Path(__file__).parent
 PARENT_DIR = SCRIPT_DIR.parent
 GENDERCOMPUTER_DIR = PARENT_DIR / 'genderComputer'
 sys.path.insert(0, str(GENDERCOMPUTER_DIR))
+sys.path.insert(0, str(PARENT_DIR))
 
 from genderComputer.genderComputer import GenderComputer
+from duckdb_utils import bulk_update, configure_connection, ensure_columns
+
+# Upper bound on memoized (forename, country) results kept between batches
+RESOLVED_CACHE_SIZE = 200_000
+
+# Batches between progress log lines
+PROGRESS_LOG_BATCHES = 10
+
+# Per-process GenderComputer, built once by _init_worker
+_worker_gc = None
+
+
+def _init_worker():
+    """
+    Initialize the genderComputer instance for this process.
+    """
+    global _worker_gc
+    _worker_gc = GenderComputer()
+
+
+def _resolve_chunk(keys):
+    """
+    Resolve a chunk of (forename, country_name) keys with this process's genderComputer.
+
+    Args:
+        keys (list): (forename, country_name) tuples
+
+    Returns:
+        list: (key, gender, error) tuples; error is None unless resolveGender raised
+    """
+    results = []
+    for forename, country_name in keys:
+        try:
+            results.append(((forename, country_name), _worker_gc.resolveGender(forename, country_name), None))
+        except Exception as e:
+            results.append(((forename, country_name), None, str(e)))
+    return results
 
 
 def setup_logging():
@@ -72,21 +113,11 @@ def ensure_column_exists(conn):
     """
     logger = logging.getLogger(__name__)
 
-    # Get current columns
-    result = conn.execute("PRAGMA table_info(authors)").fetchall()
-    existing_columns = {row[1] for row in result}  # row[1] is the column name
+    ensure_columns(conn, 'authors', {'gendercomputer_gender': 'TEXT'})
+    logger.info("Column ready: gendercomputer_gender (TEXT)")
 
-    logger.info(f"Existing columns: {existing_columns}")
-
-    # Add gendercomputer_gender column if it doesn't exist
-    if 'gendercomputer_gender' not in existing_columns:
-        logger.info("Adding column: gendercomputer_gender (TEXT)")
-        conn.execute("ALTER TABLE authors ADD COLUMN gendercomputer_gender TEXT")
-    else:
-        logger.info("Column already exists: gendercomputer_gender")
 
-
-def infer_gender_in_duckdb(db_file):
+def infer_gender_in_duckdb(db_file, workers=1):
     """
     Infer gender for authors in DuckDB database using genderComputer.
 
@@ -101,6 +132,7 @@ def infer_gender_in_duckdb(db_file):
 
     Args:
         db_file (str or Path): Path to the DuckDB database file
+        workers (int): Number of worker processes resolving names (1 = in-process)
 
     Returns:
         tuple: (total_records, male_count, female_count, unknown_count)
@@ -117,24 +149,28 @@ def infer_gender_in_duckdb(db_file):
 
     # Connect to DuckDB
     conn = duckdb.connect(str(db_file))
+    configure_connection(conn)
     logger.info("DuckDB connection established")
 
     # Ensure gendercomputer_gender column exists
     logger.info("Checking for gendercomputer_gender column...")
     ensure_column_exists(conn)
 
-    # Initialize genderComputer
-    logger.info("Initializing genderComputer...")
-    gc = GenderComputer()
+    # Initialize genderComputer, once per worker process when running in parallel
+    pool = None
+    if workers > 1:
+        logger.info(f"Initializing genderComputer in {workers} worker processes...")
+        pool = Pool(processes=workers, initializer=_init_worker)
+        resolve_chunks = pool.imap_unordered
+    else:
+        logger.info("Initializing genderComputer...")
+        _init_worker()
+        resolve_chunks = map
     logger.info("genderComputer initialized successfully")
 
-    # Get count of authors to process (exclude those already marked as 'no_forename' in gender field)
-    count_query = """
-        SELECT COUNT(*) FROM authors
-        WHERE gender IS NULL OR gender != 'no_forename'
-    """
-    total_count = conn.execute(count_query).fetchone()[0]
-    logger.info(f"Total authors to process: {total_count:,}")
+    # Names are heavily repeated, so each (forename, country) pair is resolved once
+    resolved = {}
+    distinct_lookups = 0
 
     # Statistics
     batch_size = 10000  # Smaller batches since genderComputer may be slower
@@ -144,25 +180,43 @@ def infer_gender_in_duckdb(db_file):
     unknown_count = 0
     with_country_count = 0
     without_country_count = 0
-    start_time = datetime.now()
+    start_time = time.monotonic()
 
     logger.info("Starting gender inference...")
 
-    # Process batches
-    offset = 0
-    while offset < total_count:
-        # Fetch batch (only authors without 'no_forename' in gender field)
-        fetch_query = """
-            SELECT author_id, forename, country_name
-            FROM authors
-            WHERE gender IS NULL OR gender != 'no_forename'
-            LIMIT ? OFFSET ?
-        """
-        batch = conn.execute(fetch_query, [batch_size, offset]).fetchall()
+    # Stream authors in a single scan (only those without 'no_forename' in
+    # gender field). The read runs on its own cursor so the UPDATEs issued
+    # on conn do not invalidate the open result.
+    fetch_query = """
+        SELECT author_id, forename, country_name
+        FROM authors
+        WHERE gender IS NULL OR gender != 'no_forename'
+    """
+    reader = conn.cursor().execute(fetch_query)
+    batch_number = 0
+
+    while True:
+        batch = reader.fetchmany(batch_size)
 
         if not batch:
             break
 
+        # Resolve the batch's new (forename, country) pairs, split across workers
+        if len(resolved) > RESOLVED_CACHE_SIZE:
+            resolved.clear()
+        pending = list({
+            (forename, country_name if country_name else None)
+            for _, forename, country_name in batch
+        } - resolved.keys())
+        chunk_size = max(1, -(-len(pending) // (workers * 4)))
+        chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+        for results in resolve_chunks(_resolve_chunk, chunks):
+            for (forename, country_name), gender, error in results:
+                if error:
+                    logger.warning(f"Error inferring gender for '{forename}' ({country_name}): {error}")
+                resolved[(forename, country_name)] = gender
+        distinct_lookups += len(pending)
+
         # Prepare updates
         updates = []
         for author_id, forename, country_name in batch:
@@ -172,12 +226,7 @@ def infer_gender_in_duckdb(db_file):
             else:
                 without_country_count += 1
 
-            # Infer gender using genderComputer
-            try:
-                gender = gc.resolveGender(forename, country_name if country_name else None)
-            except Exception as e:
-                logger.warning(f"Error inferring gender for '{forename}' ({country_name}): {e}")
-                gender = None
+            gender = resolved[(forename, country_name if country_name else None)]
 
             # Update statistics
             if gender == 'male':
@@ -191,36 +240,34 @@ def infer_gender_in_duckdb(db_file):
             gender_value = gender if gender else ''
             updates.append((gender_value, author_id))
 
-        # Perform batch update
-        conn.executemany(
-            """
-            UPDATE authors
-            SET gendercomputer_gender = ?
-            WHERE author_id = ?
-            """,
-            updates
-        )
+        # Perform batch update: one UPDATE ... FROM over the registered batch
+        bulk_update(conn, 'authors', 'author_id', updates,
+                    columns=['gendercomputer_gender', 'author_id'])
 
         total_processed += len(batch)
-        offset += batch_size
+        batch_number += 1
 
-        # Log progress
-        elapsed = (datetime.now() - start_time).total_seconds()
-        rate = total_processed / elapsed if elapsed > 0 else 0
-        pct_complete = (total_processed / total_count * 100) if total_count > 0 else 0
+        # Log progress every PROGRESS_LOG_BATCHES batches
+        if batch_number % PROGRESS_LOG_BATCHES == 0:
+            elapsed = time.monotonic() - start_time
+            rate = total_processed / elapsed if elapsed > 0 else 0
 
-        logger.info(
-            f"Progress: {total_processed:,}/{total_count:,} ({pct_complete:.1f}%) | "
-            f"Rate: {rate:.0f} records/sec | "
-            f"Male: {male_count:,} | Female: {female_count:,} | Unknown: {unknown_count:,}"
-        )
+            logger.info(
+                f"Progress: {total_processed:,} processed | "
+                f"Rate: {rate:.0f} records/sec | "
+                f"Male: {male_count:,} | Female: {female_count:,} | Unknown: {unknown_count:,}"
+            )
+
+    if pool is not None:
+        pool.close()
+        pool.join()
 
     # Close connection
     conn.close()
     logger.info("DuckDB connection closed")
 
     # Final statistics
-    total_elapsed = (datetime.now() - start_time).total_seconds()
+    total_elapsed = time.monotonic() - start_time
     avg_rate = total_processed / total_elapsed if total_elapsed > 0 else 0
     success_rate = ((male_count + female_count) / total_processed * 100) if total_processed > 0 else 0
 
@@ -230,6 +277,7 @@ def infer_gender_in_duckdb(db_file):
     logger.info(f"Total records processed: {total_processed:,}")
     logger.info(f"Records with country: {with_country_count:,} ({with_country_count/total_processed*100:.2f}%)" if total_processed > 0 else "N/A")
     logger.info(f"Records without country: {without_country_count:,} ({without_country_count/total_processed*100:.2f}%)" if total_processed > 0 else "N/A")
+    logger.info(f"Distinct (forename, country) lookups: {distinct_lookups:,} (cache hits: {total_processed - distinct_lookups:,})")
     logger.info("")
     logger.info("Gender Distribution:")
     logger.info(f"  Male: {male_count:,} ({male_count/total_processed*100:.2f}%)" if total_processed > 0 else "N/A")
@@ -264,6 +312,9 @@ Examples:
   # Infer gender with custom database file
   python 05_infer_genderComputer.py --db datasets/my_authors.duckdb
 
+  # Resolve names in 8 worker processes
+  python 05_infer_genderComputer.py --workers 8
+
 Gender inference:
   - Uses forename and country_name to predict gender
   - Returns: 'male', 'female', or empty (unknown)
@@ -280,6 +331,13 @@ Gender inference:
         help=f'Path to the DuckDB database file containing author data (default: {default_db_path})'
     )
 
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=os.cpu_count() or 1,
+        help='Number of processes resolving names with genderComputer (default: CPU count)'
+    )
+
     args = parser.parse_args()
 
     # Setup logging
@@ -289,12 +347,14 @@ Gender inference:
     logger.info("AUTHOR GENDER INFERENCE WITH GENDERCOMPUTER")
     logger.info("="*70)
     logger.info(f"Database file: {args.db}")
+    logger.info(f"Workers: {args.workers}")
     logger.info("="*70)
 
     try:
         # Run gender inference
         total_records, male, female, unknown = infer_gender_in_duckdb(
-            db_file=args.db
+            db_file=args.db,
+            workers=args.workers
         )
 
         logger.info("Script completed successfully")
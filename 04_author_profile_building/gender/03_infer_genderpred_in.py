@@ -15,14 +15,22 @@ with ~96% accuracy. Returns 'male', 'female', or 'unknown' with probability scor
 import sys
 from pathlib import Path
 import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import time
+import multiprocessing
 import argparse
+import os
 import duckdb
+import pyarrow as pa
 
 SCRIPT_DIR = Path(__file__).parent
 PARENT_DIR = SCRIPT_DIR.parent
 sys.path.insert(0, str(PARENT_DIR))
 
+from duckdb_utils import bulk_update, configure_connection, ensure_columns, prefetch_batches
+
 try:
     from genderpred_in import classify_name, get_gender, get_male_probability, get_female_probability
     GENDERPRED_IN_AVAILABLE = True
@@ -30,6 +38,21 @@ except ImportError:
     GENDERPRED_IN_AVAILABLE = False
     print("WARNING: genderpred-in not installed. Install with: pip install genderpred-in")
 
+# Upper bound on memoized forename predictions kept between batches
+PREDICTION_CACHE_SIZE = 1_000_000
+
+# Batches between progress log lines
+PROGRESS_LOG_BATCHES = 10
+
+# Buffered result rows written back per UPDATE in the batch loop
+FLUSH_ROWS = 1_000_000
+
+# Batches with fewer new forenames than this are predicted in-process
+POOL_MIN_FORENAMES = 1000
+
+# Default worker processes; each holds its own copy of the LSTM
+MAX_DEFAULT_WORKERS = 8
+
 
 def setup_logging():
     """
@@ -60,9 +83,16 @@ def setup_logging():
     return logger
 
 
+GENDERPRED_IN_COLUMNS = {
+    'genderpred_in_gender': 'TEXT',
+    'genderpred_in_male_prob': 'DOUBLE',
+    'genderpred_in_female_prob': 'DOUBLE',
+}
+
+
 def ensure_columns_exist(conn):
     """
-    Check if genderpred_in columns exist in the authors table and add them if not.
+    Add the genderpred_in columns to the authors table if they do not exist.
 
     Args:
         conn: DuckDB connection object
@@ -72,31 +102,78 @@ def ensure_columns_exist(conn):
     """
     logger = logging.getLogger(__name__)
 
-    result = conn.execute("PRAGMA table_info(authors)").fetchall()
-    existing_columns = {row[1] for row in result}
+    ensure_columns(conn, 'authors', GENDERPRED_IN_COLUMNS)
+    logger.info(f"genderpred-in columns ready: {', '.join(GENDERPRED_IN_COLUMNS)}")
 
-    logger.info(f"Existing columns: {existing_columns}")
 
-    if 'genderpred_in_gender' not in existing_columns:
-        logger.info("Adding column: genderpred_in_gender (TEXT)")
-        conn.execute("ALTER TABLE authors ADD COLUMN genderpred_in_gender TEXT")
-    else:
-        logger.info("Column already exists: genderpred_in_gender")
+def predict_forename(forename):
+    """
+    Predict gender for one forename with genderpred-in.
 
-    if 'genderpred_in_male_prob' not in existing_columns:
-        logger.info("Adding column: genderpred_in_male_prob (DOUBLE)")
-        conn.execute("ALTER TABLE authors ADD COLUMN genderpred_in_male_prob DOUBLE")
-    else:
-        logger.info("Column already exists: genderpred_in_male_prob")
+    Args:
+        forename (str): Forename to classify
 
-    if 'genderpred_in_female_prob' not in existing_columns:
-        logger.info("Adding column: genderpred_in_female_prob (DOUBLE)")
-        conn.execute("ALTER TABLE authors ADD COLUMN genderpred_in_female_prob DOUBLE")
-    else:
-        logger.info("Column already exists: genderpred_in_female_prob")
+    Returns:
+        tuple: (gender, male_prob, female_prob); gender is 'unknown' unless male or
+        female, and missing or blank forenames are 'unknown' without calling the model
+    """
+    if not forename or not forename.strip():
+        return 'unknown', 0.0, 0.0
+
+    result = classify_name(forename)
+    gender = get_gender(result)
+    male_prob = get_male_probability(result)
+    female_prob = get_female_probability(result)
+
+    if gender is None or gender.lower() not in ['male', 'female']:
+        gender = 'unknown'
+
+    return gender, male_prob, female_prob
+
+
+def _predict_chunk(forenames):
+    """
+    Predict a chunk of forenames (runs in a worker process or in-process).
+
+    Args:
+        forenames (list): Distinct forenames
+
+    Returns:
+        list: (forename, (gender, male_prob, female_prob), error) tuples; error is
+        None unless classification raised, in which case the prediction is unknown
+    """
+    results = []
+    for forename in forenames:
+        try:
+            results.append((forename, predict_forename(forename), None))
+        except Exception as e:
+            results.append((forename, ('unknown', 0.0, 0.0), str(e)))
+    return results
+
+
+def author_filter(country_filter=None, force=False):
+    """
+    Build the WHERE condition selecting the authors to classify.
+
+    Args:
+        country_filter (str, optional): Only select authors from this country
+        force (bool): Also select authors that already have a genderpred_in_gender
+
+    Returns:
+        tuple: (SQL condition on the authors table, list of query parameters)
+    """
+    where = "(gender IS NULL OR gender != 'no_forename')"
+    params = []
+    if not force:
+        where += " AND genderpred_in_gender IS NULL"
+    if country_filter:
+        where += " AND country_name = ?"
+        params.append(country_filter)
+    return where, params
 
 
-def infer_gender_in_duckdb(db_file, country_filter=None):
+def infer_gender_in_duckdb(db_file, country_filter=None, force=False, batch_size=50000, workers=1,
+                           flush_rows=FLUSH_ROWS, memory_limit=None, temp_directory=None):
     """
     Infer gender for authors in DuckDB database using genderpred-in.
 
@@ -111,6 +188,12 @@ def infer_gender_in_duckdb(db_file, country_filter=None):
     Args:
         db_file (str or Path): Path to the DuckDB database file
         country_filter (str, optional): If provided, only process authors from this country (e.g., 'India')
+        force (bool): Reclassify authors that already have a genderpred_in_gender
+        batch_size (int): Number of authors fetched and predicted per batch
+        workers (int): Number of worker processes classifying forenames (1 = in-process)
+        flush_rows (int): Buffered results written back to the database per UPDATE
+        memory_limit (str, optional): DuckDB memory limit such as '8GB' (default: DuckDB's own)
+        temp_directory (str, optional): Directory DuckDB spills to when over the memory limit
 
     Returns:
         tuple: (total_records, male_count, female_count, unknown_count)
@@ -125,6 +208,7 @@ def infer_gender_in_duckdb(db_file, country_filter=None):
     logger.info(f"Database file: {db_file}")
 
     conn = duckdb.connect(str(db_file))
+    configure_connection(conn, memory_limit=memory_limit, temp_directory=temp_directory)
     logger.info("DuckDB connection established")
 
     logger.info("Checking for genderpred_in columns...")
@@ -135,115 +219,147 @@ def infer_gender_in_duckdb(db_file, country_filter=None):
         raise ImportError("genderpred-in package not available. Install with: pip install genderpred-in")
     logger.info("genderpred-in initialized successfully")
 
+    # Workers are spawned, not forked: the model's TensorFlow runtime is
+    # already loaded in this process (and in the orchestrator's, when run
+    # in-process) and is not fork-safe
+    pool = None
+    if workers > 1:
+        logger.info(f"Classifying forenames in {workers} worker processes")
+        pool = multiprocessing.get_context('spawn').Pool(processes=workers)
+
+    # Forenames are heavily repeated, so run the LSTM once per distinct forename
+    predicted = {}
+    distinct_predictions = 0
+
+    where, params = author_filter(country_filter, force)
+
+    # Materialize the authors to process once; the count and the streamed
+    # read both come from this snapshot instead of filtering authors twice.
+    # Temp tables are private to a connection, so it lives on the reader
+    # cursor, which also keeps the UPDATEs issued on conn from invalidating
+    # the open result.
+    reader_conn = conn.cursor()
+    reader_conn.execute(
+        f"""
+        CREATE OR REPLACE TEMP TABLE genderpred_in_todo AS
+        SELECT author_id, forename, lower(country_name) = 'india' AS is_india
+        FROM authors
+        WHERE {where}
+        """,
+        params
+    )
+    total_count = reader_conn.execute("SELECT COUNT(*) FROM genderpred_in_todo").fetchone()[0]
     if country_filter:
-        count_query = """
-            SELECT COUNT(*) FROM authors
-            WHERE (gender IS NULL OR gender != 'no_forename')
-            AND country_name = ?
-        """
-        total_count = conn.execute(count_query, [country_filter]).fetchone()[0]
         logger.info(f"Total authors to process (filtered by {country_filter}): {total_count:,}")
     else:
-        count_query = """
-            SELECT COUNT(*) FROM authors
-            WHERE gender IS NULL OR gender != 'no_forename'
-        """
-        total_count = conn.execute(count_query).fetchone()[0]
         logger.info(f"Total authors to process: {total_count:,}")
 
-    batch_size = 10000
     total_processed = 0
     male_count = 0
     female_count = 0
     unknown_count = 0
     india_count = 0
     non_india_count = 0
-    start_time = datetime.now()
+    start_time = time.monotonic()
+
+    # Per-batch results, written back with one UPDATE every flush_rows rows.
+    # The UPDATE runs on a writer thread while the next batches are fetched
+    # and predicted; at most one write is in flight at a time.
+    unwritten = []
+    unwritten_rows = 0
+    writer = ThreadPoolExecutor(max_workers=1)
+    pending_write = None
 
     logger.info("Starting gender inference...")
 
-    offset = 0
-    while offset < total_count:
-        if country_filter:
-            fetch_query = """
-                SELECT author_id, forename, country_name
-                FROM authors
-                WHERE (gender IS NULL OR gender != 'no_forename')
-                AND country_name = ?
-                LIMIT ? OFFSET ?
-            """
-            batch = conn.execute(fetch_query, [country_filter, batch_size, offset]).fetchall()
+    # Stream the snapshot as columnar Arrow record batches rather than lists of
+    # row tuples, reading the next batch while the current one is predicted
+    batch_number = 0
+    reader = reader_conn.execute("SELECT * FROM genderpred_in_todo").fetch_record_batch(batch_size)
+
+    for batch in prefetch_batches(reader):
+        if batch.num_rows == 0:
+            continue
+
+        author_ids = batch.column('author_id')
+        forenames = batch.column('forename').to_pylist()
+
+        # Classify the batch's new forenames, split across workers when worthwhile
+        if len(predicted) > PREDICTION_CACHE_SIZE:
+            predicted.clear()
+        pending = list(set(forenames) - predicted.keys())
+        if pool is not None and len(pending) >= POOL_MIN_FORENAMES:
+            chunk_size = max(1, -(-len(pending) // (workers * 4)))
+            chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+            chunk_results = pool.imap_unordered(_predict_chunk, chunks)
         else:
-            fetch_query = """
-                SELECT author_id, forename, country_name
-                FROM authors
-                WHERE gender IS NULL OR gender != 'no_forename'
-                LIMIT ? OFFSET ?
-            """
-            batch = conn.execute(fetch_query, [batch_size, offset]).fetchall()
-
-        if not batch:
-            break
-
-        updates = []
-        for author_id, forename, country_name in batch:
-            if country_name and country_name.lower() == 'india':
-                india_count += 1
-            else:
-                non_india_count += 1
-
-            try:
-                result = classify_name(forename)
-                gender = get_gender(result)
-                male_prob = get_male_probability(result)
-                female_prob = get_female_probability(result)
-
-                if gender is None or gender.lower() not in ['male', 'female']:
-                    gender = 'unknown'
-
-            except Exception as e:
-                logger.warning(f"Error inferring gender for '{forename}': {e}")
-                gender = 'unknown'
-                male_prob = 0.0
-                female_prob = 0.0
-
-            if gender == 'male':
-                male_count += 1
-            elif gender == 'female':
-                female_count += 1
-            else:
-                unknown_count += 1
-
-            updates.append((gender, male_prob, female_prob, author_id))
-
-        conn.executemany(
-            """
-            UPDATE authors
-            SET genderpred_in_gender = ?,
-                genderpred_in_male_prob = ?,
-                genderpred_in_female_prob = ?
-            WHERE author_id = ?
-            """,
-            updates
-        )
-
-        total_processed += len(batch)
-        offset += batch_size
-
-        elapsed = (datetime.now() - start_time).total_seconds()
-        rate = total_processed / elapsed if elapsed > 0 else 0
-        pct_complete = (total_processed / total_count * 100) if total_count > 0 else 0
-
-        logger.info(
-            f"Progress: {total_processed:,}/{total_count:,} ({pct_complete:.1f}%) | "
-            f"Rate: {rate:.0f} records/sec | "
-            f"Male: {male_count:,} | Female: {female_count:,} | Unknown: {unknown_count:,}"
-        )
+            chunk_results = [_predict_chunk(pending)]
+        for results in chunk_results:
+            for forename, prediction, error in results:
+                if error:
+                    logger.warning(f"Error inferring gender for '{forename}': {error}")
+                predicted[forename] = prediction
+        distinct_predictions += len(pending)
+
+        batch_india = batch.column('is_india').true_count
+        india_count += batch_india
+        non_india_count += batch.num_rows - batch_india
+
+        genders, male_probs, female_probs = zip(*(predicted[forename] for forename in forenames))
+
+        gender_counts = Counter(genders)
+        male_count += gender_counts['male']
+        female_count += gender_counts['female']
+        unknown_count += len(genders) - gender_counts['male'] - gender_counts['female']
+
+        unwritten.append(pa.table({
+            'genderpred_in_gender': pa.array(genders, pa.string()),
+            'genderpred_in_male_prob': pa.array(male_probs, pa.float64()),
+            'genderpred_in_female_prob': pa.array(female_probs, pa.float64()),
+            'author_id': author_ids,
+        }))
+        unwritten_rows += batch.num_rows
+
+        # One UPDATE ... FROM over all buffered batches, registered as an Arrow table
+        if unwritten_rows >= flush_rows:
+            if pending_write is not None:
+                pending_write.result()
+            pending_write = writer.submit(
+                bulk_update, conn, 'authors', 'author_id', pa.concat_tables(unwritten)
+            )
+            unwritten = []
+            unwritten_rows = 0
+
+        total_processed += batch.num_rows
+        batch_number += 1
+
+        # Log progress every PROGRESS_LOG_BATCHES batches
+        if batch_number % PROGRESS_LOG_BATCHES == 0:
+            elapsed = time.monotonic() - start_time
+            rate = total_processed / elapsed if elapsed > 0 else 0
+            pct_complete = (total_processed / total_count * 100) if total_count > 0 else 0
+
+            logger.info(
+                f"Progress: {total_processed:,}/{total_count:,} ({pct_complete:.1f}%) | "
+                f"Rate: {rate:.0f} records/sec | "
+                f"Male: {male_count:,} | Female: {female_count:,} | Unknown: {unknown_count:,}"
+            )
+
+    if pending_write is not None:
+        pending_write.result()
+    writer.shutdown()
+
+    if unwritten:
+        bulk_update(conn, 'authors', 'author_id', pa.concat_tables(unwritten))
+
+    if pool is not None:
+        pool.close()
+        pool.join()
 
     conn.close()
     logger.info("DuckDB connection closed")
 
-    total_elapsed = (datetime.now() - start_time).total_seconds()
+    total_elapsed = time.monotonic() - start_time
     avg_rate = total_processed / total_elapsed if total_elapsed > 0 else 0
     success_rate = ((male_count + female_count) / total_processed * 100) if total_processed > 0 else 0
 
@@ -253,6 +369,7 @@ def infer_gender_in_duckdb(db_file, country_filter=None):
     logger.info(f"Total records processed: {total_processed:,}")
     logger.info(f"Records from India: {india_count:,} ({india_count/total_processed*100:.2f}%)" if total_processed > 0 else "N/A")
     logger.info(f"Records from other countries: {non_india_count:,} ({non_india_count/total_processed*100:.2f}%)" if total_processed > 0 else "N/A")
+    logger.info(f"Distinct forename predictions: {distinct_predictions:,}")
     logger.info("")
     logger.info("Gender Distribution:")
     logger.info(f"  Male: {male_count:,} ({male_count/total_processed*100:.2f}%)" if total_processed > 0 else "N/A")
@@ -267,6 +384,158 @@ def infer_gender_in_duckdb(db_file, country_filter=None):
     return total_processed, male_count, female_count, unknown_count
 
 
+def infer_gender_with_udf(db_file, country_filter=None, force=False, memory_limit=None, temp_directory=None):
+    """
+    Infer gender inside DuckDB with genderpred-in registered as a Python UDF.
+
+    Predicts each distinct forename once into a temp table, then applies the
+    predictions with a single UPDATE ... FROM, so rows never round-trip
+    through Python. Results match infer_gender_in_duckdb.
+
+    Args:
+        db_file (str or Path): Path to the DuckDB database file
+        country_filter (str, optional): If provided, only process authors from this country (e.g., 'India')
+        force (bool): Reclassify authors that already have a genderpred_in_gender
+        memory_limit (str, optional): DuckDB memory limit such as '8GB' (default: DuckDB's own)
+        temp_directory (str, optional): Directory DuckDB spills to when over the memory limit
+
+    Returns:
+        tuple: (total_records, male_count, female_count, unknown_count)
+    """
+    logger = logging.getLogger(__name__)
+
+    db_file = Path(db_file)
+
+    if not db_file.exists():
+        raise FileNotFoundError(f"Database file not found: {db_file}")
+
+    if not GENDERPRED_IN_AVAILABLE:
+        raise ImportError("genderpred-in package not available. Install with: pip install genderpred-in")
+
+    conn = duckdb.connect(str(db_file))
+    configure_connection(conn, memory_limit=memory_limit, temp_directory=temp_directory)
+    logger.info("DuckDB connection established")
+
+    ensure_columns_exist(conn)
+
+    def genderpred_in_udf(forename):
+        try:
+            gender, male_prob, female_prob = predict_forename(forename)
+        except Exception as e:
+            logger.warning(f"Error inferring gender for '{forename}': {e}")
+            gender = 'unknown'
+            male_prob = 0.0
+            female_prob = 0.0
+
+        return {'gender': gender, 'male_prob': male_prob, 'female_prob': female_prob}
+
+    conn.create_function(
+        'genderpred_in',
+        genderpred_in_udf,
+        ['VARCHAR'],
+        'STRUCT(gender VARCHAR, male_prob DOUBLE, female_prob DOUBLE)',
+        null_handling='special'
+    )
+
+    where, params = author_filter(country_filter, force)
+
+    start_time = time.monotonic()
+
+    logger.info("Predicting distinct forenames...")
+    conn.execute(
+        f"""
+        CREATE OR REPLACE TEMP TABLE genderpred_in_predictions AS
+        SELECT forename, genderpred_in(forename) AS p
+        FROM (SELECT DISTINCT forename FROM authors WHERE {where})
+        """,
+        params
+    )
+    distinct_count = conn.execute("SELECT COUNT(*) FROM genderpred_in_predictions").fetchone()[0]
+    logger.info(f"Distinct forename predictions: {distinct_count:,}")
+
+    # Statistics come from the join, before the UPDATE changes which rows match
+    total_processed, male_count, female_count, india_count = conn.execute(
+        f"""
+        SELECT
+            COUNT(*),
+            COUNT(*) FILTER (WHERE u.p.gender = 'male'),
+            COUNT(*) FILTER (WHERE u.p.gender = 'female'),
+            COUNT(*) FILTER (WHERE lower(country_name) = 'india')
+        FROM authors
+        JOIN genderpred_in_predictions u ON authors.forename IS NOT DISTINCT FROM u.forename
+        WHERE {where}
+        """,
+        params
+    ).fetchone()
+    unknown_count = total_processed - male_count - female_count
+
+    logger.info("Updating authors...")
+    conn.execute(
+        f"""
+        UPDATE authors
+        SET genderpred_in_gender = u.p.gender,
+            genderpred_in_male_prob = u.p.male_prob,
+            genderpred_in_female_prob = u.p.female_prob
+        FROM genderpred_in_predictions u
+        WHERE authors.forename IS NOT DISTINCT FROM u.forename
+        AND {where}
+        """,
+        params
+    )
+
+    conn.close()
+    logger.info("DuckDB connection closed")
+
+    total_elapsed = time.monotonic() - start_time
+    avg_rate = total_processed / total_elapsed if total_elapsed > 0 else 0
+
+    logger.info("="*70)
+    logger.info("GENDERPRED-IN GENDER INFERENCE COMPLETE (UDF)")
+    logger.info("="*70)
+    logger.info(f"Total records processed: {total_processed:,}")
+    logger.info(f"Records from India: {india_count:,}")
+    logger.info("")
+    logger.info("Gender Distribution:")
+    logger.info(f"  Male: {male_count:,} ({male_count/total_processed*100:.2f}%)" if total_processed > 0 else "N/A")
+    logger.info(f"  Female: {female_count:,} ({female_count/total_processed*100:.2f}%)" if total_processed > 0 else "N/A")
+    logger.info(f"  Unknown: {unknown_count:,} ({unknown_count/total_processed*100:.2f}%)" if total_processed > 0 else "N/A")
+    logger.info("")
+    logger.info(f"Total time: {total_elapsed:.2f} seconds")
+    logger.info(f"Average rate: {avg_rate:.0f} records/sec")
+    logger.info("="*70)
+
+    return total_processed, male_count, female_count, unknown_count
+
+
+def run(db_path, batch_size=50000, workers=None) -> bool:
+    """
+    Run genderpred-in inference in the current process.
+
+    Used by gender_orchestrator.py, which calls it directly instead of
+    starting a new interpreter, so TensorFlow and the other heavy imports
+    are loaded once per pipeline rather than once per tool.
+
+    Args:
+        db_path (Path): Path to the DuckDB database file
+        batch_size (int): Number of authors fetched and predicted per batch
+        workers (int, optional): Worker processes (default: CPU count, at most MAX_DEFAULT_WORKERS)
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    logger = logging.getLogger(__name__)
+
+    if workers is None:
+        workers = min(os.cpu_count() or 1, MAX_DEFAULT_WORKERS)
+
+    try:
+        infer_gender_in_duckdb(db_path, batch_size=batch_size, workers=workers)
+        return True
+    except Exception as e:
+        logger.error(f"Fatal error: {e}", exc_info=True)
+        return False
+
+
 def main():
     """
     Main entry point for the script.
@@ -289,11 +558,29 @@ Examples:
   # Infer gender with custom database file
   python 11_infer_genderpred_in.py --db datasets/my_authors.duckdb
 
+  # Run predictions inside DuckDB as a UDF over distinct forenames
+  python 11_infer_genderpred_in.py --udf
+
+  # Reclassify authors that already have a prediction
+  python 11_infer_genderpred_in.py --force
+
+  # Cap DuckDB at 8GB and spill to a scratch disk
+  python 11_infer_genderpred_in.py --memory-limit 8GB --temp-dir /scratch/duckdb_tmp
+
+  # Classify forenames in 4 worker processes
+  python 11_infer_genderpred_in.py --workers 4
+
 Gender inference:
   - Uses LSTM neural network trained on Indian names (~96% accuracy)
   - Returns: 'male', 'female', or 'unknown' with probability scores
   - Best results for Indian names, but can process any name
   - Results stored in genderpred_in_gender, genderpred_in_male_prob, genderpred_in_female_prob columns
+
+DuckDB settings:
+  - Every connection uses all CPU cores (threads) and disables
+    preserve_insertion_order, which the bulk UPDATEs do not need
+  - --memory-limit caps DuckDB's memory (e.g. 8GB); default is DuckDB's own (80% of RAM)
+  - --temp-dir sets where DuckDB spills when over the limit
         """
     )
 
@@ -311,6 +598,54 @@ Gender inference:
         help='Filter by country name (e.g., "India") to process only authors from that country'
     )
 
+    parser.add_argument(
+        '--udf',
+        action='store_true',
+        help='Predict inside DuckDB via a registered UDF instead of the batch loop'
+    )
+
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=50000,
+        help='Number of authors per batch in the batch loop (default: 50000)'
+    )
+
+    parser.add_argument(
+        '--flush-rows',
+        type=int,
+        default=FLUSH_ROWS,
+        help=f'Buffered results written back per UPDATE in the batch loop (default: {FLUSH_ROWS})'
+    )
+
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=min(os.cpu_count() or 1, MAX_DEFAULT_WORKERS),
+        help=f'Number of processes classifying forenames in the batch loop '
+             f'(default: CPU count, at most {MAX_DEFAULT_WORKERS})'
+    )
+
+    parser.add_argument(
+        '--memory-limit',
+        type=str,
+        default=None,
+        help="DuckDB memory limit, e.g. 8GB (default: DuckDB's own)"
+    )
+
+    parser.add_argument(
+        '--temp-dir',
+        type=str,
+        default=None,
+        help='Directory DuckDB spills to when over the memory limit'
+    )
+
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Reclassify all authors (default: only authors without a genderpred_in_gender)'
+    )
+
     args = parser.parse_args()
 
     logger = setup_logging()
@@ -324,10 +659,25 @@ Gender inference:
     logger.info("="*70)
 
     try:
-        total_records, male, female, unknown = infer_gender_in_duckdb(
-            db_file=args.db,
-            country_filter=args.country
-        )
+        if args.udf:
+            total_records, male, female, unknown = infer_gender_with_udf(
+                db_file=args.db,
+                country_filter=args.country,
+                force=args.force,
+                memory_limit=args.memory_limit,
+                temp_directory=args.temp_dir
+            )
+        else:
+            total_records, male, female, unknown = infer_gender_in_duckdb(
+                db_file=args.db,
+                country_filter=args.country,
+                force=args.force,
+                batch_size=args.batch_size,
+                workers=args.workers,
+                flush_rows=args.flush_rows,
+                memory_limit=args.memory_limit,
+                temp_directory=args.temp_dir
+            )
 
         logger.info("Script completed successfully")
         return 0
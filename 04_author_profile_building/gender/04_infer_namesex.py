@@ -18,14 +18,20 @@ This script includes graceful error handling.
 import sys
 from pathlib import Path
 import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import time
 import argparse
 import duckdb
+import pyarrow as pa
 
 SCRIPT_DIR = Path(__file__).parent
 PARENT_DIR = SCRIPT_DIR.parent
 sys.path.insert(0, str(PARENT_DIR))
 
+from duckdb_utils import bulk_update, configure_connection, ensure_columns, prefetch_batches
+
 try:
     from namesex.namesex import namesex as NameSexClassifier
     NAMESEX_AVAILABLE = True
@@ -34,6 +40,15 @@ except ImportError as e:
     print(f"WARNING: namesex not available: {e}")
     print("Install with: pip install namesex scikit-learn")
 
+# Upper bound on memoized forename predictions kept between batches
+PREDICTION_CACHE_SIZE = 1_000_000
+
+# Batches between progress log lines
+PROGRESS_LOG_BATCHES = 10
+
+# Buffered result rows written back per UPDATE in the batch loop
+FLUSH_ROWS = 1_000_000
+
 
 def setup_logging():
     """
@@ -64,9 +79,15 @@ def setup_logging():
     return logger
 
 
+NAMESEX_COLUMNS = {
+    'namesex_gender': 'TEXT',
+    'namesex_prob': 'DOUBLE',
+}
+
+
 def ensure_columns_exist(conn):
     """
-    Check if namesex columns exist in the authors table and add them if not.
+    Add the namesex columns to the authors table if they do not exist.
 
     Args:
         conn: DuckDB connection object
@@ -76,25 +97,77 @@ def ensure_columns_exist(conn):
     """
     logger = logging.getLogger(__name__)
 
-    result = conn.execute("PRAGMA table_info(authors)").fetchall()
-    existing_columns = {row[1] for row in result}
+    ensure_columns(conn, 'authors', NAMESEX_COLUMNS)
+    logger.info(f"namesex columns ready: {', '.join(NAMESEX_COLUMNS)}")
+
+
+def parse_namesex_prediction(pred):
+    """
+    Convert a namesex prediction into a (gender, probability) pair.
+
+    Args:
+        pred: One element of ns.predict(..., predprob=True)
+
+    Returns:
+        tuple: ('male' | 'female' | 'unknown', probability)
+    """
+    if isinstance(pred, tuple) and len(pred) == 2:
+        gender, prob = pred
+        if gender == 0:
+            gender_str = 'female'
+        elif gender == 1:
+            gender_str = 'male'
+        else:
+            gender_str = 'unknown'
+
+        return gender_str, float(prob) if prob else 0.0
+
+    return 'unknown', 0.0
+
+
+def create_namesex_classifier():
+    """
+    Create the namesex classifier, raising a descriptive error if unavailable.
+
+    Returns:
+        NameSexClassifier: Initialized namesex classifier
+    """
+    logger = logging.getLogger(__name__)
+
+    logger.info("Initializing namesex...")
+    if not NAMESEX_AVAILABLE:
+        raise ImportError(
+            "namesex package not available. Install with: pip install namesex scikit-learn\n"
+            "NOTE: namesex may have compatibility issues with newer Python versions."
+        )
+
+    try:
+        ns = NameSexClassifier()
+        logger.info("namesex initialized successfully")
+    except Exception as e:
+        raise RuntimeError(f"Failed to initialize namesex: {e}\nThis may be a compatibility issue with scikit-learn version.")
+
+    return ns
 
-    logger.info(f"Existing columns: {existing_columns}")
 
-    if 'namesex_gender' not in existing_columns:
-        logger.info("Adding column: namesex_gender (TEXT)")
-        conn.execute("ALTER TABLE authors ADD COLUMN namesex_gender TEXT")
-    else:
-        logger.info("Column already exists: namesex_gender")
+def author_filter(force=False):
+    """
+    Build the WHERE condition selecting the authors to classify.
+
+    Args:
+        force (bool): Also select authors that already have a namesex_gender
 
-    if 'namesex_prob' not in existing_columns:
-        logger.info("Adding column: namesex_prob (DOUBLE)")
-        conn.execute("ALTER TABLE authors ADD COLUMN namesex_prob DOUBLE")
-    else:
-        logger.info("Column already exists: namesex_prob")
+    Returns:
+        str: SQL condition on the authors table
+    """
+    where = "(gender IS NULL OR gender != 'no_forename')"
+    if not force:
+        where += " AND namesex_gender IS NULL"
+    return where
 
 
-def infer_gender_in_duckdb(db_file):
+def infer_gender_in_duckdb(db_file, force=False, batch_size=50000, flush_rows=FLUSH_ROWS,
+                           memory_limit=None, temp_directory=None):
     """
     Infer gender for authors in DuckDB database using namesex.
 
@@ -108,6 +181,11 @@ def infer_gender_in_duckdb(db_file):
 
     Args:
         db_file (str or Path): Path to the DuckDB database file
+        force (bool): Reclassify authors that already have a namesex_gender
+        batch_size (int): Number of authors fetched and predicted per batch
+        flush_rows (int): Buffered results written back to the database per UPDATE
+        memory_limit (str, optional): DuckDB memory limit such as '8GB' (default: DuckDB's own)
+        temp_directory (str, optional): Directory DuckDB spills to when over the memory limit
 
     Returns:
         tuple: (total_records, male_count, female_count, unknown_count)
@@ -122,124 +200,138 @@ def infer_gender_in_duckdb(db_file):
     logger.info(f"Database file: {db_file}")
 
     conn = duckdb.connect(str(db_file))
+    configure_connection(conn, memory_limit=memory_limit, temp_directory=temp_directory)
     logger.info("DuckDB connection established")
 
     logger.info("Checking for namesex columns...")
     ensure_columns_exist(conn)
 
-    logger.info("Initializing namesex...")
-    if not NAMESEX_AVAILABLE:
-        raise ImportError(
-            "namesex package not available. Install with: pip install namesex scikit-learn\n"
-            "NOTE: namesex may have compatibility issues with newer Python versions."
-        )
-
-    try:
-        ns = NameSexClassifier()
-        logger.info("namesex initialized successfully")
-    except Exception as e:
-        raise RuntimeError(f"Failed to initialize namesex: {e}\nThis may be a compatibility issue with scikit-learn version.")
-
-    count_query = """
-        SELECT COUNT(*) FROM authors
-        WHERE gender IS NULL OR gender != 'no_forename'
-    """
-    total_count = conn.execute(count_query).fetchone()[0]
+    ns = create_namesex_classifier()
+
+    where = author_filter(force)
+
+    # Materialize the authors to process once; the count and the streamed
+    # read both come from this snapshot instead of filtering authors twice.
+    # Temp tables are private to a connection, so it lives on the reader
+    # cursor, which also keeps the UPDATEs issued on conn from invalidating
+    # the open result. Missing forenames are predicted as '', mapped here
+    # rather than per row.
+    reader_conn = conn.cursor()
+    reader_conn.execute(
+        f"""
+        CREATE OR REPLACE TEMP TABLE namesex_todo AS
+        SELECT author_id, coalesce(forename, '') AS forename
+        FROM authors
+        WHERE {where}
+        """
+    )
+    total_count = reader_conn.execute("SELECT COUNT(*) FROM namesex_todo").fetchone()[0]
     logger.info(f"Total authors to process: {total_count:,}")
 
-    batch_size = 1000
     total_processed = 0
     male_count = 0
     female_count = 0
     unknown_count = 0
     error_count = 0
-    start_time = datetime.now()
+    predicted = {}  # forename -> (gender, probability), shared across batches
+    distinct_predictions = 0
+    start_time = time.monotonic()
+
+    # Per-batch results, written back with one UPDATE every flush_rows rows.
+    # The UPDATE runs on a writer thread while the next batches are fetched
+    # and predicted; at most one write is in flight at a time.
+    unwritten = []
+    unwritten_rows = 0
+    writer = ThreadPoolExecutor(max_workers=1)
+    pending_write = None
 
     logger.info("Starting gender inference...")
 
-    offset = 0
-    while offset < total_count:
-        fetch_query = """
-            SELECT author_id, forename, country_name
-            FROM authors
-            WHERE gender IS NULL OR gender != 'no_forename'
-            LIMIT ? OFFSET ?
-        """
-        batch = conn.execute(fetch_query, [batch_size, offset]).fetchall()
-
-        if not batch:
-            break
+    # Stream the snapshot as columnar Arrow record batches rather than lists of
+    # row tuples, reading the next batch while the current one is predicted
+    batch_number = 0
+    reader = reader_conn.execute("SELECT * FROM namesex_todo").fetch_record_batch(batch_size)
 
-        author_ids = []
-        forenames = []
+    for batch in prefetch_batches(reader):
+        if batch.num_rows == 0:
+            continue
 
-        for author_id, forename, country_name in batch:
-            author_ids.append(author_id)
-            forenames.append(forename if forename else '')
+        author_ids = batch.column('author_id')
+        forenames = batch.column('forename').to_pylist()
 
         try:
-            predictions = ns.predict(forenames, predprob=True)
-
-            updates = []
-            for i, (author_id, pred) in enumerate(zip(author_ids, predictions)):
-                if isinstance(pred, tuple) and len(pred) == 2:
-                    gender, prob = pred
-                    if gender == 0:
-                        gender_str = 'female'
-                    elif gender == 1:
-                        gender_str = 'male'
-                    else:
-                        gender_str = 'unknown'
-
-                    prob_value = float(prob) if prob else 0.0
-                else:
-                    gender_str = 'unknown'
-                    prob_value = 0.0
-
-                if gender_str == 'male':
-                    male_count += 1
-                elif gender_str == 'female':
-                    female_count += 1
-                else:
-                    unknown_count += 1
-
-                updates.append((gender_str, prob_value, author_id))
+            # Predict only forenames not seen in earlier batches, once each
+            if len(predicted) > PREDICTION_CACHE_SIZE:
+                predicted.clear()
+            # Blank forenames are unknown without a model call
+            pending = list(set(forenames) - predicted.keys())
+            named = [forename for forename in pending if forename.strip()]
+            predicted.update((forename, ('unknown', 0.0)) for forename in pending if not forename.strip())
+            if named:
+                predicted.update(
+                    (forename, parse_namesex_prediction(pred))
+                    for forename, pred in zip(named, ns.predict(named, predprob=True))
+                )
+            distinct_predictions += len(pending)
+
+            # Rows only look up their forename's parsed (gender, probability)
+            genders, probs = zip(*(predicted[forename] for forename in forenames))
+
+            gender_counts = Counter(genders)
+            male_count += gender_counts['male']
+            female_count += gender_counts['female']
+            unknown_count += len(genders) - gender_counts['male'] - gender_counts['female']
 
         except Exception as e:
             logger.error(f"Batch prediction failed: {e}")
-            updates = []
-            for author_id in author_ids:
-                updates.append(('unknown', 0.0, author_id))
-                unknown_count += 1
-            error_count += len(author_ids)
-
-        conn.executemany(
-            """
-            UPDATE authors
-            SET namesex_gender = ?,
-                namesex_prob = ?
-            WHERE author_id = ?
-            """,
-            updates
-        )
-
-        total_processed += len(batch)
-        offset += batch_size
-
-        elapsed = (datetime.now() - start_time).total_seconds()
-        rate = total_processed / elapsed if elapsed > 0 else 0
-        pct_complete = (total_processed / total_count * 100) if total_count > 0 else 0
-
-        logger.info(
-            f"Progress: {total_processed:,}/{total_count:,} ({pct_complete:.1f}%) | "
-            f"Rate: {rate:.0f} records/sec | "
-            f"Male: {male_count:,} | Female: {female_count:,} | Unknown: {unknown_count:,}"
-        )
+            genders = ['unknown'] * batch.num_rows
+            probs = [0.0] * batch.num_rows
+            unknown_count += batch.num_rows
+            error_count += batch.num_rows
+
+        unwritten.append(pa.table({
+            'namesex_gender': pa.array(genders, pa.string()),
+            'namesex_prob': pa.array(probs, pa.float64()),
+            'author_id': author_ids,
+        }))
+        unwritten_rows += batch.num_rows
+
+        # One UPDATE ... FROM over all buffered batches, registered as an Arrow table
+        if unwritten_rows >= flush_rows:
+            if pending_write is not None:
+                pending_write.result()
+            pending_write = writer.submit(
+                bulk_update, conn, 'authors', 'author_id', pa.concat_tables(unwritten)
+            )
+            unwritten = []
+            unwritten_rows = 0
+
+        total_processed += batch.num_rows
+        batch_number += 1
+
+        # Log progress every PROGRESS_LOG_BATCHES batches
+        if batch_number % PROGRESS_LOG_BATCHES == 0:
+            elapsed = time.monotonic() - start_time
+            rate = total_processed / elapsed if elapsed > 0 else 0
+            pct_complete = (total_processed / total_count * 100) if total_count > 0 else 0
+
+            logger.info(
+                f"Progress: {total_processed:,}/{total_count:,} ({pct_complete:.1f}%) | "
+                f"Rate: {rate:.0f} records/sec | "
+                f"Male: {male_count:,} | Female: {female_count:,} | Unknown: {unknown_count:,}"
+            )
+
+    if pending_write is not None:
+        pending_write.result()
+    writer.shutdown()
+
+    if unwritten:
+        bulk_update(conn, 'authors', 'author_id', pa.concat_tables(unwritten))
 
     conn.close()
     logger.info("DuckDB connection closed")
 
-    total_elapsed = (datetime.now() - start_time).total_seconds()
+    total_elapsed = time.monotonic() - start_time
     avg_rate = total_processed / total_elapsed if total_elapsed > 0 else 0
     success_rate = ((male_count + female_count) / total_processed * 100) if total_processed > 0 else 0
 
@@ -248,6 +340,7 @@ def infer_gender_in_duckdb(db_file):
     logger.info("="*70)
     logger.info(f"Total records processed: {total_processed:,}")
     logger.info(f"Errors encountered: {error_count:,}")
+    logger.info(f"Distinct forename predictions: {distinct_predictions:,}")
     logger.info("")
     logger.info("Gender Distribution:")
     logger.info(f"  Male: {male_count:,} ({male_count/total_processed*100:.2f}%)" if total_processed > 0 else "N/A")
@@ -262,6 +355,157 @@ def infer_gender_in_duckdb(db_file):
     return total_processed, male_count, female_count, unknown_count
 
 
+def infer_gender_with_udf(db_file, force=False, memory_limit=None, temp_directory=None):
+    """
+    Infer gender inside DuckDB with namesex registered as a vectorized UDF.
+
+    DuckDB hands the UDF whole vectors of distinct forenames as Arrow arrays,
+    so namesex predicts in batches; the predictions are then applied with a
+    single UPDATE ... FROM. Results match infer_gender_in_duckdb.
+
+    Args:
+        db_file (str or Path): Path to the DuckDB database file
+        force (bool): Reclassify authors that already have a namesex_gender
+        memory_limit (str, optional): DuckDB memory limit such as '8GB' (default: DuckDB's own)
+        temp_directory (str, optional): Directory DuckDB spills to when over the memory limit
+
+    Returns:
+        tuple: (total_records, male_count, female_count, unknown_count)
+    """
+    logger = logging.getLogger(__name__)
+
+    db_file = Path(db_file)
+
+    if not db_file.exists():
+        raise FileNotFoundError(f"Database file not found: {db_file}")
+
+    conn = duckdb.connect(str(db_file))
+    configure_connection(conn, memory_limit=memory_limit, temp_directory=temp_directory)
+    logger.info("DuckDB connection established")
+
+    ensure_columns_exist(conn)
+    ns = create_namesex_classifier()
+
+    result_type = pa.struct([('gender', pa.string()), ('prob', pa.float64())])
+    failed_forenames = 0
+
+    def namesex_udf(forenames):
+        nonlocal failed_forenames
+        names = [forename if forename else '' for forename in forenames.to_pylist()]
+        try:
+            results = [parse_namesex_prediction(pred) for pred in ns.predict(names, predprob=True)]
+        except Exception as e:
+            logger.error(f"Batch prediction failed: {e}")
+            results = [('unknown', 0.0)] * len(names)
+            failed_forenames += len(names)
+        return pa.array(
+            [{'gender': gender, 'prob': prob} for gender, prob in results], type=result_type
+        )
+
+    conn.create_function(
+        'namesex',
+        namesex_udf,
+        ['VARCHAR'],
+        'STRUCT(gender VARCHAR, prob DOUBLE)',
+        type='arrow',
+        null_handling='special'
+    )
+
+    where = author_filter(force)
+
+    start_time = time.monotonic()
+
+    logger.info("Predicting distinct forenames...")
+    conn.execute(
+        f"""
+        CREATE OR REPLACE TEMP TABLE namesex_predictions AS
+        SELECT
+            forename,
+            CASE
+                WHEN trim(forename) = '' THEN {{'gender': 'unknown', 'prob': 0.0::DOUBLE}}
+                ELSE namesex(forename)
+            END AS p
+        FROM (SELECT DISTINCT coalesce(forename, '') AS forename FROM authors WHERE {where})
+        """
+    )
+    distinct_count = conn.execute("SELECT COUNT(*) FROM namesex_predictions").fetchone()[0]
+    logger.info(f"Distinct forename predictions: {distinct_count:,}")
+
+    # Statistics come from the join, before the UPDATE changes which rows match
+    total_processed, male_count, female_count = conn.execute(
+        f"""
+        SELECT
+            COUNT(*),
+            COUNT(*) FILTER (WHERE u.p.gender = 'male'),
+            COUNT(*) FILTER (WHERE u.p.gender = 'female')
+        FROM authors
+        JOIN namesex_predictions u ON coalesce(authors.forename, '') = u.forename
+        WHERE {where}
+        """
+    ).fetchone()
+    unknown_count = total_processed - male_count - female_count
+
+    logger.info("Updating authors...")
+    conn.execute(
+        f"""
+        UPDATE authors
+        SET namesex_gender = u.p.gender,
+            namesex_prob = u.p.prob
+        FROM namesex_predictions u
+        WHERE coalesce(authors.forename, '') = u.forename
+        AND {where}
+        """
+    )
+
+    conn.close()
+    logger.info("DuckDB connection closed")
+
+    total_elapsed = time.monotonic() - start_time
+    avg_rate = total_processed / total_elapsed if total_elapsed > 0 else 0
+
+    logger.info("="*70)
+    logger.info("NAMESEX GENDER INFERENCE COMPLETE (UDF)")
+    logger.info("="*70)
+    logger.info(f"Total records processed: {total_processed:,}")
+    logger.info(f"Forenames with failed predictions: {failed_forenames:,}")
+    logger.info("")
+    logger.info("Gender Distribution:")
+    logger.info(f"  Male: {male_count:,} ({male_count/total_processed*100:.2f}%)" if total_processed > 0 else "N/A")
+    logger.info(f"  Female: {female_count:,} ({female_count/total_processed*100:.2f}%)" if total_processed > 0 else "N/A")
+    logger.info(f"  Unknown: {unknown_count:,} ({unknown_count/total_processed*100:.2f}%)" if total_processed > 0 else "N/A")
+    logger.info("")
+    logger.info(f"Total time: {total_elapsed:.2f} seconds")
+    logger.info(f"Average rate: {avg_rate:.0f} records/sec")
+    logger.info("="*70)
+
+    return total_processed, male_count, female_count, unknown_count
+
+
+def run(db_path, batch_size=50000) -> bool:
+    """
+    Run namesex inference in the current process.
+
+    Used by gender_orchestrator.py, which calls it directly instead of
+    starting a new interpreter, so scikit-learn and the other heavy imports
+    are loaded once per pipeline rather than once per tool.
+
+    Args:
+        db_path (Path): Path to the DuckDB database file
+        batch_size (int): Number of authors fetched and predicted per batch
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    logger = logging.getLogger(__name__)
+
+    try:
+        infer_gender_in_duckdb(db_path, batch_size=batch_size)
+        return True
+    except Exception as e:
+        logger.error(f"Fatal error: {e}", exc_info=True)
+        return False
+
+
 def main():
     """
     Main entry point for the script.
@@ -281,12 +525,27 @@ Examples:
   # Infer gender with custom database file
   python 12_infer_namesex.py --db datasets/my_authors.duckdb
 
+  # Run predictions inside DuckDB as a UDF over distinct forenames
+  python 12_infer_namesex.py --udf
+
+  # Reclassify authors that already have a prediction
+  python 12_infer_namesex.py --force
+
+  # Cap DuckDB at 8GB and spill to a scratch disk
+  python 12_infer_namesex.py --memory-limit 8GB --temp-dir /scratch/duckdb_tmp
+
 Gender inference:
   - Uses Random Forest classifier with word2vec features
   - Returns: 'male', 'female', or 'unknown' with probability scores
   - General purpose, not region-specific
   - Results stored in namesex_gender and namesex_prob columns
 
+DuckDB settings:
+  - Every connection uses all CPU cores (threads) and disables
+    preserve_insertion_order, which the bulk UPDATEs do not need
+  - --memory-limit caps DuckDB's memory (e.g. 8GB); default is DuckDB's own (80% of RAM)
+  - --temp-dir sets where DuckDB spills when over the limit
+
 Compatibility Note:
   - namesex may have compatibility issues with newer Python/scikit-learn versions
   - If you encounter errors, try: pip install scikit-learn==0.24.2
@@ -300,6 +559,46 @@ Compatibility Note:
         help=f'Path to the DuckDB database file containing author data (default: {default_db_path})'
     )
 
+    parser.add_argument(
+        '--udf',
+        action='store_true',
+        help='Predict inside DuckDB via a registered UDF instead of the batch loop'
+    )
+
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=50000,
+        help='Number of authors per batch in the batch loop (default: 50000)'
+    )
+
+    parser.add_argument(
+        '--flush-rows',
+        type=int,
+        default=FLUSH_ROWS,
+        help=f'Buffered results written back per UPDATE in the batch loop (default: {FLUSH_ROWS})'
+    )
+
+    parser.add_argument(
+        '--memory-limit',
+        type=str,
+        default=None,
+        help="DuckDB memory limit, e.g. 8GB (default: DuckDB's own)"
+    )
+
+    parser.add_argument(
+        '--temp-dir',
+        type=str,
+        default=None,
+        help='Directory DuckDB spills to when over the memory limit'
+    )
+
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Reclassify all authors (default: only authors without a namesex_gender)'
+    )
+
     args = parser.parse_args()
 
     logger = setup_logging()
@@ -311,9 +610,22 @@ Compatibility Note:
     logger.info("="*70)
 
     try:
-        total_records, male, female, unknown = infer_gender_in_duckdb(
-            db_file=args.db
-        )
+        if args.udf:
+            total_records, male, female, unknown = infer_gender_with_udf(
+                db_file=args.db,
+                force=args.force,
+                memory_limit=args.memory_limit,
+                temp_directory=args.temp_dir
+            )
+        else:
+            total_records, male, female, unknown = infer_gender_in_duckdb(
+                db_file=args.db,
+                force=args.force,
+                batch_size=args.batch_size,
+                flush_rows=args.flush_rows,
+                memory_limit=args.memory_limit,
+                temp_directory=args.temp_dir
+            )
 
         logger.info("Script completed successfully")
         return 0
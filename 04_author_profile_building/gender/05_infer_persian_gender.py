@@ -15,14 +15,23 @@ Returns 'MALE', 'FEMALE', or 'UNKNOWN'.
 import sys
 from pathlib import Path
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import time
+from functools import partial
+from multiprocessing import Pool
 import argparse
+import os
 import duckdb
+import pyarrow as pa
+import pyarrow.compute as pc
 
 SCRIPT_DIR = Path(__file__).parent
 PARENT_DIR = SCRIPT_DIR.parent
 sys.path.insert(0, str(PARENT_DIR))
 
+from duckdb_utils import bulk_update, prefetch_batches
+
 try:
     from persian_gender_detection import get_gender, get_gender_nearest
     PERSIAN_GENDER_AVAILABLE = True
@@ -30,6 +39,27 @@ except ImportError:
     PERSIAN_GENDER_AVAILABLE = False
     print("WARNING: persian-gender-detection not installed. Install with: pip install persian-gender-detection")
 
+# Batches between progress log lines
+PROGRESS_LOG_BATCHES = 10
+
+# Staged result rows written back per UPDATE
+FLUSH_ROWS = 1_000_000
+
+# Upper bound on memoized forename lookups kept between batches
+PREDICTION_CACHE_SIZE = 1_000_000
+
+# Lookup errors logged individually per batch; the rest are only counted
+ERROR_SAMPLES = 5
+
+# Batches with fewer new forenames than this are looked up in-process
+POOL_MIN_FORENAMES = 1000
+
+# Default worker processes for forename lookups
+MAX_DEFAULT_WORKERS = 8
+
+# persian-gender-detection results stored in persian_gender; anything else is 'unknown'
+GENDER_LABELS = {'MALE': 'male', 'FEMALE': 'female'}
+
 
 def setup_logging():
     """
@@ -84,14 +114,104 @@ def ensure_column_exists(conn):
         logger.info("Column already exists: persian_gender")
 
 
-def infer_gender_in_duckdb(db_file, country_filter=None, use_nearest=True):
+def is_classifiable(forename):
+    """
+    Check whether a forename is worth looking up.
+
+    Missing or blank forenames and bare initials (e.g. "J.") cannot be
+    classified, and the nearest-match fallback would otherwise map them to
+    an arbitrary similar name.
+
+    Args:
+        forename (str): Forename to check
+
+    Returns:
+        bool: True if the forename has at least two characters besides periods and whitespace
+    """
+    return bool(forename) and len(forename.replace('.', '').strip()) >= 2
+
+
+def classify_exact(forename):
+    """
+    Look up one forename with persian-gender-detection's exact match only.
+
+    Args:
+        forename (str): Forename to classify
+
+    Returns:
+        tuple: (gender, nearest_used); gender is the library's 'MALE', 'FEMALE' or
+        'UNKNOWN', and nearest_used is always False. Errors from get_gender propagate.
+    """
+    return get_gender(forename), False
+
+
+def classify_with_nearest(forename):
+    """
+    Look up one forename, falling back to get_gender_nearest when the exact match is UNKNOWN.
+
+    Args:
+        forename (str): Forename to classify
+
+    Returns:
+        tuple: (gender, nearest_used); gender is the library's 'MALE', 'FEMALE' or
+        'UNKNOWN', and nearest_used is True when the nearest match supplied it.
+        Errors from get_gender propagate; errors from get_gender_nearest leave
+        the exact result.
+    """
+    gender = get_gender(forename)
+    nearest_used = False
+
+    if gender == 'UNKNOWN':
+        try:
+            result = get_gender_nearest(forename)
+            if isinstance(result, tuple) and len(result) == 2:
+                gender, matched_name = result
+                nearest_used = gender != 'UNKNOWN'
+        except Exception:
+            pass
+
+    return gender, nearest_used
+
+
+def _classify_chunk(forenames, use_nearest=True):
+    """
+    Classify a chunk of forenames (runs in a worker process or in-process).
+
+    Args:
+        forenames (list): Distinct forenames
+        use_nearest (bool): Fall back to get_gender_nearest when the exact lookup is UNKNOWN
+
+    Returns:
+        list: (forename, (gender, nearest_used), error) tuples with gender already
+        mapped to 'male', 'female' or 'unknown'; error is None unless the lookup
+        raised, in which case the gender is 'unknown'. Forenames failing
+        is_classifiable are 'unknown' without a lookup.
+    """
+    # Choose the lookup once per chunk rather than testing use_nearest per name
+    classify = classify_with_nearest if use_nearest else classify_exact
+
+    results = []
+    for forename in forenames:
+        if not is_classifiable(forename):
+            results.append((forename, ('unknown', False), None))
+            continue
+        try:
+            gender, nearest_used = classify(forename)
+            results.append((forename, (GENDER_LABELS.get(gender, 'unknown'), nearest_used), None))
+        except Exception as e:
+            results.append((forename, ('unknown', False), str(e)))
+    return results
+
+
+def infer_gender_in_duckdb(db_file, country_filter=None, use_nearest=True, batch_size=10000,
+                           workers=1, flush_rows=FLUSH_ROWS):
     """
     Infer gender for authors in DuckDB database using persian-gender-detection.
 
     This function:
     1. Connects to the DuckDB database
     2. Ensures persian_gender column exists
-    3. Reads authors in batches (optionally filtered by country)
+    3. Streams authors in batches (optionally filtered by country)
     4. Infers gender for each author based on forename
     5. Uses get_gender_nearest for better matching if enabled
     6. Updates the database with inferred gender
@@ -101,6 +221,9 @@ def infer_gender_in_duckdb(db_file, country_filter=None, use_nearest=True):
         db_file (str or Path): Path to the DuckDB database file
         country_filter (str, optional): If provided, only process authors from this country (e.g., 'Iran')
         use_nearest (bool): If True, use get_gender_nearest for better matching (default: True)
+        batch_size (int): Number of authors fetched per batch
+        workers (int): Number of worker processes looking up forenames (1 = in-process)
+        flush_rows (int): Staged results written back to the database per UPDATE
 
     Returns:
         tuple: (total_records, male_count, female_count, unknown_count)
@@ -125,23 +248,38 @@ def infer_gender_in_duckdb(db_file, country_filter=None, use_nearest=True):
         raise ImportError("persian-gender-detection package not available. Install with: pip install persian-gender-detection")
     logger.info(f"persian-gender-detection initialized successfully (use_nearest={use_nearest})")
 
+    pool = None
+    if workers > 1:
+        logger.info(f"Looking up forenames in {workers} worker processes")
+        pool = Pool(processes=workers)
+
+    where = "(gender IS NULL OR gender != 'no_forename')"
+    params = []
+    if country_filter:
+        where += " AND country_name = ?"
+        params.append(country_filter)
+
+    # Materialize the authors to process once; the count and the streamed
+    # read both come from this snapshot instead of filtering authors twice.
+    # Temp tables are private to a connection, so it lives on the reader
+    # cursor, which also keeps the UPDATEs issued on conn from invalidating
+    # the open result.
+    reader_conn = conn.cursor()
+    reader_conn.execute(
+        f"""
+        CREATE OR REPLACE TEMP TABLE persian_gender_todo AS
+        SELECT author_id, forename, lower(country_name) = 'iran' AS is_iran
+        FROM authors
+        WHERE {where}
+        """,
+        params
+    )
+    total_count = reader_conn.execute("SELECT COUNT(*) FROM persian_gender_todo").fetchone()[0]
     if country_filter:
-        count_query = """
-            SELECT COUNT(*) FROM authors
-            WHERE (gender IS NULL OR gender != 'no_forename')
-            AND country_name = ?
-        """
-        total_count = conn.execute(count_query, [country_filter]).fetchone()[0]
         logger.info(f"Total authors to process (filtered by {country_filter}): {total_count:,}")
     else:
-        count_query = """
-            SELECT COUNT(*) FROM authors
-            WHERE gender IS NULL OR gender != 'no_forename'
-        """
-        total_count = conn.execute(count_query).fetchone()[0]
         logger.info(f"Total authors to process: {total_count:,}")
 
-    batch_size = 10000
     total_processed = 0
     male_count = 0
     female_count = 0
@@ -149,95 +287,122 @@ def infer_gender_in_duckdb(db_file, country_filter=None, use_nearest=True):
     iran_count = 0
     non_iran_count = 0
     nearest_used_count = 0
-    start_time = datetime.now()
+    start_time = time.monotonic()
 
-    logger.info("Starting gender inference...")
+    # Forenames are heavily repeated, so each is looked up once
+    predicted = {}
+    distinct_lookups = 0
+    error_count = 0
 
-    offset = 0
-    while offset < total_count:
-        if country_filter:
-            fetch_query = """
-                SELECT author_id, forename, country_name
-                FROM authors
-                WHERE (gender IS NULL OR gender != 'no_forename')
-                AND country_name = ?
-                LIMIT ? OFFSET ?
-            """
-            batch = conn.execute(fetch_query, [country_filter, batch_size, offset]).fetchall()
-        else:
-            fetch_query = """
-                SELECT author_id, forename, country_name
-                FROM authors
-                WHERE gender IS NULL OR gender != 'no_forename'
-                LIMIT ? OFFSET ?
-            """
-            batch = conn.execute(fetch_query, [batch_size, offset]).fetchall()
-
-        if not batch:
-            break
-
-        updates = []
-        for author_id, forename, country_name in batch:
-            if country_name and country_name.lower() == 'iran':
-                iran_count += 1
-            else:
-                non_iran_count += 1
-
-            try:
-                gender = get_gender(forename)
-
-                if gender == 'UNKNOWN' and use_nearest:
-                    try:
-                        result = get_gender_nearest(forename)
-                        if isinstance(result, tuple) and len(result) == 2:
-                            gender, matched_name = result
-                            if gender != 'UNKNOWN':
-                                nearest_used_count += 1
-                    except Exception:
-                        pass
-
-            except Exception as e:
-                logger.warning(f"Error inferring gender for '{forename}': {e}")
-                gender = 'UNKNOWN'
-
-            if gender == 'MALE':
-                male_count += 1
-                gender_value = 'male'
-            elif gender == 'FEMALE':
-                female_count += 1
-                gender_value = 'female'
-            else:
-                unknown_count += 1
-                gender_value = 'unknown'
-
-            updates.append((gender_value, author_id))
-
-        conn.executemany(
-            """
-            UPDATE authors
-            SET persian_gender = ?
-            WHERE author_id = ?
-            """,
-            updates
-        )
-
-        total_processed += len(batch)
-        offset += batch_size
+    # Results are staged as Arrow tables and written back with one UPDATE
+    # every flush_rows rows. The UPDATE runs on a writer thread while the
+    # next batches are fetched and predicted; at most one write is in flight.
+    unwritten = []
+    unwritten_rows = 0
+    writer = ThreadPoolExecutor(max_workers=1)
+    pending_write = None
 
-        elapsed = (datetime.now() - start_time).total_seconds()
-        rate = total_processed / elapsed if elapsed > 0 else 0
-        pct_complete = (total_processed / total_count * 100) if total_count > 0 else 0
+    logger.info("Starting gender inference...")
 
-        logger.info(
-            f"Progress: {total_processed:,}/{total_count:,} ({pct_complete:.1f}%) | "
-            f"Rate: {rate:.0f} records/sec | "
-            f"Male: {male_count:,} | Female: {female_count:,} | Unknown: {unknown_count:,}"
-        )
+    # Stream the snapshot in a single scan instead of re-filtering with
+    # LIMIT/OFFSET per batch, reading the next batch while the current one
+    # is classified
+    reader = reader_conn.execute("SELECT * FROM persian_gender_todo").fetch_record_batch(batch_size)
+
+    batch_number = 0
+    for batch in prefetch_batches(reader):
+        if batch.num_rows == 0:
+            continue
+
+        # Dictionary-encode the forenames: only the batch's distinct values are
+        # turned into Python strings, and results are gathered back per row by index
+        encoded = pc.dictionary_encode(batch.column('forename'), null_encoding='encode')
+        forenames = encoded.dictionary.to_pylist()
+
+        # Look up each of the batch's new forenames once, split across workers when worthwhile
+        if len(predicted) > PREDICTION_CACHE_SIZE:
+            predicted.clear()
+        pending = [forename for forename in forenames if forename not in predicted]
+        if pool is not None and len(pending) >= POOL_MIN_FORENAMES:
+            chunk_size = max(1, -(-len(pending) // (workers * 4)))
+            chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+            chunk_results = pool.imap_unordered(partial(_classify_chunk, use_nearest=use_nearest), chunks)
+        else:
+            chunk_results = [_classify_chunk(pending, use_nearest)]
+        batch_errors = 0
+        for results in chunk_results:
+            for forename, prediction, error in results:
+                if error:
+                    batch_errors += 1
+                    if batch_errors <= ERROR_SAMPLES:
+                        logger.warning(f"Error inferring gender for '{forename}': {error}")
+                predicted[forename] = prediction
+        distinct_lookups += len(pending)
+        if batch_errors > ERROR_SAMPLES:
+            logger.warning(f"... {batch_errors - ERROR_SAMPLES:,} more lookup errors in this batch")
+        error_count += batch_errors
+
+        batch_iran = batch.column('is_iran').true_count
+        iran_count += batch_iran
+        non_iran_count += batch.num_rows - batch_iran
+
+        labels, nearest_used = zip(*(predicted[forename] for forename in forenames))
+        genders = pa.array(labels, pa.string()).take(encoded.indices)
+        nearest_used_count += pa.array(nearest_used, pa.bool_()).take(encoded.indices).true_count
+
+        value_counts = pc.value_counts(genders)
+        gender_counts = dict(zip(value_counts.field('values').to_pylist(),
+                                 value_counts.field('counts').to_pylist()))
+        male_count += gender_counts.get('male', 0)
+        female_count += gender_counts.get('female', 0)
+        unknown_count += batch.num_rows - gender_counts.get('male', 0) - gender_counts.get('female', 0)
+
+        unwritten.append(pa.table({
+            'persian_gender': genders,
+            'author_id': batch.column('author_id'),
+        }))
+        unwritten_rows += batch.num_rows
+
+        # One UPDATE ... FROM over all staged batches, registered as an Arrow table
+        if unwritten_rows >= flush_rows:
+            if pending_write is not None:
+                pending_write.result()
+            pending_write = writer.submit(
+                bulk_update, conn, 'authors', 'author_id', pa.concat_tables(unwritten)
+            )
+            unwritten = []
+            unwritten_rows = 0
+
+        total_processed += batch.num_rows
+        batch_number += 1
+
+        # Log progress every PROGRESS_LOG_BATCHES batches
+        if batch_number % PROGRESS_LOG_BATCHES == 0:
+            elapsed = time.monotonic() - start_time
+            rate = total_processed / elapsed if elapsed > 0 else 0
+            pct_complete = (total_processed / total_count * 100) if total_count > 0 else 0
+
+            logger.info(
+                f"Progress: {total_processed:,}/{total_count:,} ({pct_complete:.1f}%) | "
+                f"Rate: {rate:.0f} records/sec | "
+                f"Male: {male_count:,} | Female: {female_count:,} | Unknown: {unknown_count:,}"
+            )
+
+    if pending_write is not None:
+        pending_write.result()
+    writer.shutdown()
+
+    if unwritten:
+        bulk_update(conn, 'authors', 'author_id', pa.concat_tables(unwritten))
+
+    if pool is not None:
+        pool.close()
+        pool.join()
 
     conn.close()
     logger.info("DuckDB connection closed")
 
-    total_elapsed = (datetime.now() - start_time).total_seconds()
+    total_elapsed = time.monotonic() - start_time
     avg_rate = total_processed / total_elapsed if total_elapsed > 0 else 0
     success_rate = ((male_count + female_count) / total_processed * 100) if total_processed > 0 else 0
 
@@ -249,6 +414,9 @@ def infer_gender_in_duckdb(db_file, country_filter=None, use_nearest=True):
     logger.info(f"Records from other countries: {non_iran_count:,} ({non_iran_count/total_processed*100:.2f}%)" if total_processed > 0 else "N/A")
     if use_nearest:
         logger.info(f"Nearest match used: {nearest_used_count:,} times")
+    logger.info(f"Distinct forename lookups: {distinct_lookups:,} (cache hits: {total_processed - distinct_lookups:,})")
+    if error_count:
+        logger.info(f"Lookup errors (stored as unknown): {error_count:,}")
     logger.info("")
     logger.info("Gender Distribution:")
     logger.info(f"  Male: {male_count:,} ({male_count/total_processed*100:.2f}%)" if total_processed > 0 else "N/A")
@@ -288,6 +456,9 @@ Examples:
   # Infer gender with custom database file
   python 13_infer_persian_gender.py --db datasets/my_authors.duckdb
 
+  # Look up forenames in 4 worker processes
+  python 13_infer_persian_gender.py --workers 4
+
 Gender inference:
   - Uses database of 19K+ Persian names
   - Returns: 'male', 'female', or 'unknown'
@@ -317,6 +488,28 @@ Gender inference:
         help='Disable nearest matching (use exact match only)'
     )
 
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=10000,
+        help='Number of authors fetched per batch (default: 10000)'
+    )
+
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=min(os.cpu_count() or 1, MAX_DEFAULT_WORKERS),
+        help=f'Number of processes looking up forenames '
+             f'(default: CPU count, at most {MAX_DEFAULT_WORKERS})'
+    )
+
+    parser.add_argument(
+        '--flush-rows',
+        type=int,
+        default=FLUSH_ROWS,
+        help=f'Staged results written back per UPDATE (default: {FLUSH_ROWS})'
+    )
+
     args = parser.parse_args()
 
     logger = setup_logging()
@@ -328,13 +521,17 @@ Gender inference:
     if args.country:
         logger.info(f"Country filter: {args.country}")
     logger.info(f"Nearest matching: {'disabled' if args.no_nearest else 'enabled'}")
+    logger.info(f"Workers: {args.workers}")
     logger.info("="*70)
 
     try:
         total_records, male, female, unknown = infer_gender_in_duckdb(
             db_file=args.db,
             country_filter=args.country,
-            use_nearest=not args.no_nearest
+            use_nearest=not args.no_nearest,
+            batch_size=args.batch_size,
+            workers=args.workers,
+            flush_rows=args.flush_rows
         )
 
         logger.info("Script completed successfully")
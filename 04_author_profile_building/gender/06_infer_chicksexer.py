@@ -16,14 +16,20 @@ Returns probability scores for male/female classification.
 import sys
 from pathlib import Path
 import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import time
 import argparse
 import duckdb
+import pyarrow as pa
 
 SCRIPT_DIR = Path(__file__).parent
 PARENT_DIR = SCRIPT_DIR.parent
 sys.path.insert(0, str(PARENT_DIR))
 
+from duckdb_utils import bulk_update, prefetch_batches
+
 try:
     from chicksexer import predict_gender, predict_genders
     CHICKSEXER_AVAILABLE = True
@@ -31,6 +37,21 @@ except ImportError:
     CHICKSEXER_AVAILABLE = False
     print("WARNING: chicksexer not installed. Install with: pip install chicksexer")
 
+# Batches between progress log lines
+PROGRESS_LOG_BATCHES = 10
+
+# Staged result rows written back per UPDATE
+FLUSH_ROWS = 1_000_000
+
+# Upper bound on memoized name predictions kept between batches
+PREDICTION_CACHE_SIZE = 1_000_000
+
+# Names per predict_genders call; large calls amortize TensorFlow's per-call overhead
+PREDICT_BATCH_SIZE = 4096
+
+# Stored for names chicksexer could not predict
+FAILED_PREDICTION = ('neutral', 0.0, 0.0)
+
 
 def setup_logging():
     """
@@ -97,21 +118,81 @@ def ensure_columns_exist(conn):
         logger.info("Column already exists: chicksexer_female_prob")
 
 
-def infer_gender_in_duckdb(db_file, batch_size=100):
+def parse_prediction(pred):
+    """
+    Turn one chicksexer prediction into a gender label and probabilities.
+
+    Args:
+        pred: chicksexer result, normally a dict of 'male'/'female' probabilities
+
+    Returns:
+        tuple: (gender, male_prob, female_prob); gender is 'neutral' unless one
+        probability is above 0.5 and higher than the other
+    """
+    if isinstance(pred, dict):
+        male_prob = pred.get('male', 0.0)
+        female_prob = pred.get('female', 0.0)
+
+        if male_prob > female_prob and male_prob > 0.5:
+            gender = 'male'
+        elif female_prob > male_prob and female_prob > 0.5:
+            gender = 'female'
+        else:
+            gender = 'neutral'
+        return gender, male_prob, female_prob
+
+    return (str(pred) if pred else 'neutral'), 0.0, 0.0
+
+
+def predict_chunk(names):
+    """
+    Predict one chunk of distinct names with chicksexer.
+
+    The chunk goes to predict_genders in a single call. One bad name fails
+    the whole call, so on failure the chunk is retried name by name with
+    predict_gender and only the names that still fail are left out.
+
+    Args:
+        names (list): Distinct names to predict
+
+    Returns:
+        tuple: (results, errors); results maps each predicted name to
+        parse_prediction output, errors holds one exception per failed name
+    """
+    if len(names) > 1:
+        try:
+            return dict(zip(names, map(parse_prediction, predict_genders(names)))), []
+        except Exception:
+            pass
+
+    results = {}
+    errors = []
+    for name in names:
+        try:
+            results[name] = parse_prediction(predict_gender(name))
+        except Exception as e:
+            errors.append(e)
+    return results, errors
+
+
+def infer_gender_in_duckdb(db_file, batch_size=50000, predict_batch_size=PREDICT_BATCH_SIZE,
+                           flush_rows=FLUSH_ROWS):
     """
     Infer gender for authors in DuckDB database using chicksexer.
 
     This function:
     1. Connects to the DuckDB database
     2. Ensures chicksexer columns exist
-    3. Reads authors in batches
+    3. Streams authors in batches
     4. Infers gender for each author based on display_name
     5. Updates the database with inferred gender and probabilities
     6. Tracks inference statistics
 
     Args:
         db_file (str or Path): Path to the DuckDB database file
-        batch_size (int): Number of names to process per batch (chicksexer supports batching)
+        batch_size (int): Number of authors fetched from the database per batch
+        predict_batch_size (int): Number of names passed to chicksexer per prediction call
+        flush_rows (int): Staged results written back to the database per UPDATE
 
     Returns:
         tuple: (total_records, male_count, female_count, neutral_count)
@@ -147,101 +228,121 @@ def infer_gender_in_duckdb(db_file, batch_size=100):
     male_count = 0
     female_count = 0
     neutral_count = 0
-    start_time = datetime.now()
+    start_time = time.monotonic()
+
+    # Display names repeat (shared names, duplicate author records), so the
+    # LSTM runs once per distinct name
+    predicted = {}
+    distinct_predictions = 0
+    failed_names = 0
+
+    # Results are staged as Arrow tables and written back with one UPDATE
+    # every flush_rows rows. The UPDATE runs on a writer thread while the
+    # next batches are fetched and predicted; at most one write is in flight.
+    unwritten = []
+    unwritten_rows = 0
+    writer = ThreadPoolExecutor(max_workers=1)
+    pending_write = None
 
     logger.info("Starting gender inference...")
 
-    offset = 0
-    while offset < total_count:
-        fetch_query = """
-            SELECT author_id, display_name, forename
-            FROM authors
-            WHERE gender IS NULL OR gender != 'no_forename'
-            LIMIT ? OFFSET ?
-        """
-        batch = conn.execute(fetch_query, [batch_size, offset]).fetchall()
-
-        if not batch:
-            break
-
-        author_ids = []
-        names = []
-
-        for author_id, display_name, forename in batch:
-            author_ids.append(author_id)
-            name = display_name if display_name else (forename if forename else '')
-            names.append(name)
-
-        try:
-            if len(names) > 1:
-                predictions = predict_genders(names)
-            else:
-                predictions = [predict_gender(names[0])]
-
-            updates = []
-            for author_id, pred in zip(author_ids, predictions):
-                if isinstance(pred, dict):
-                    male_prob = pred.get('male', 0.0)
-                    female_prob = pred.get('female', 0.0)
-
-                    if male_prob > female_prob and male_prob > 0.5:
-                        gender = 'male'
-                        male_count += 1
-                    elif female_prob > male_prob and female_prob > 0.5:
-                        gender = 'female'
-                        female_count += 1
-                    else:
-                        gender = 'neutral'
-                        neutral_count += 1
-                else:
-                    gender = str(pred) if pred else 'neutral'
-                    male_prob = 0.0
-                    female_prob = 0.0
-
-                    if gender == 'male':
-                        male_count += 1
-                    elif gender == 'female':
-                        female_count += 1
-                    else:
-                        neutral_count += 1
-
-                updates.append((gender, male_prob, female_prob, author_id))
+    # Stream the authors in a single scan instead of re-filtering with
+    # LIMIT/OFFSET per batch. The read runs on its own cursor so the UPDATEs
+    # issued on conn do not invalidate the open result. The next batch is
+    # read while the current one is predicted.
+    fetch_query = """
+        SELECT author_id, display_name, forename
+        FROM authors
+        WHERE gender IS NULL OR gender != 'no_forename'
+    """
+    reader = conn.cursor().execute(fetch_query).fetch_record_batch(batch_size)
+
+    batch_number = 0
+    for batch in prefetch_batches(reader):
+        if batch.num_rows == 0:
+            continue
+
+        author_ids = batch.column('author_id')
+        names = [
+            display_name if display_name else (forename if forename else '')
+            for display_name, forename in zip(batch.column('display_name').to_pylist(),
+                                              batch.column('forename').to_pylist())
+        ]
 
-        except Exception as e:
-            logger.error(f"Batch prediction failed: {e}")
-            updates = []
-            for author_id in author_ids:
-                updates.append(('neutral', 0.0, 0.0, author_id))
-                neutral_count += 1
-
-        conn.executemany(
-            """
-            UPDATE authors
-            SET chicksexer_gender = ?,
-                chicksexer_male_prob = ?,
-                chicksexer_female_prob = ?
-            WHERE author_id = ?
-            """,
-            updates
+        # Predict the batch's new names, predict_batch_size names per model
+        # call independent of how many rows each fetch returns
+        if len(predicted) > PREDICTION_CACHE_SIZE:
+            predicted.clear()
+        pending = list(set(names) - predicted.keys())
+        batch_failures = []
+        for start in range(0, len(pending), predict_batch_size):
+            results, errors = predict_chunk(pending[start:start + predict_batch_size])
+            predicted.update(results)
+            batch_failures.extend(errors)
+        distinct_predictions += len(pending)
+        failed_names += len(batch_failures)
+
+        # One line per batch, however many names failed. Failures are not
+        # cached, so a failed name is tried again when it next appears.
+        if batch_failures:
+            logger.error(
+                f"Prediction failed for {len(batch_failures)} name(s), set to neutral: "
+                f"{batch_failures[0]}"
+            )
+
+        genders, male_probs, female_probs = zip(
+            *(predicted.get(name, FAILED_PREDICTION) for name in names)
         )
 
-        total_processed += len(batch)
-        offset += batch_size
-
-        elapsed = (datetime.now() - start_time).total_seconds()
-        rate = total_processed / elapsed if elapsed > 0 else 0
-        pct_complete = (total_processed / total_count * 100) if total_count > 0 else 0
-
-        logger.info(
-            f"Progress: {total_processed:,}/{total_count:,} ({pct_complete:.1f}%) | "
-            f"Rate: {rate:.1f} records/sec | "
-            f"Male: {male_count:,} | Female: {female_count:,} | Neutral: {neutral_count:,}"
-        )
+        gender_counts = Counter(genders)
+        male_count += gender_counts['male']
+        female_count += gender_counts['female']
+        neutral_count += len(genders) - gender_counts['male'] - gender_counts['female']
+
+        unwritten.append(pa.table({
+            'chicksexer_gender': pa.array(genders, pa.string()),
+            'chicksexer_male_prob': pa.array(male_probs, pa.float64()),
+            'chicksexer_female_prob': pa.array(female_probs, pa.float64()),
+            'author_id': author_ids,
+        }))
+        unwritten_rows += batch.num_rows
+
+        # One UPDATE ... FROM over all staged batches, registered as an Arrow table
+        if unwritten_rows >= flush_rows:
+            if pending_write is not None:
+                pending_write.result()
+            pending_write = writer.submit(
+                bulk_update, conn, 'authors', 'author_id', pa.concat_tables(unwritten)
+            )
+            unwritten = []
+            unwritten_rows = 0
+
+        total_processed += batch.num_rows
+        batch_number += 1
+
+        # Log progress every PROGRESS_LOG_BATCHES batches
+        if batch_number % PROGRESS_LOG_BATCHES == 0:
+            elapsed = time.monotonic() - start_time
+            rate = total_processed / elapsed if elapsed > 0 else 0
+            pct_complete = (total_processed / total_count * 100) if total_count > 0 else 0
+
+            logger.info(
+                f"Progress: {total_processed:,}/{total_count:,} ({pct_complete:.1f}%) | "
+                f"Rate: {rate:.1f} records/sec | "
+                f"Male: {male_count:,} | Female: {female_count:,} | Neutral: {neutral_count:,}"
+            )
+
+    if pending_write is not None:
+        pending_write.result()
+    writer.shutdown()
+
+    if unwritten:
+        bulk_update(conn, 'authors', 'author_id', pa.concat_tables(unwritten))
 
     conn.close()
     logger.info("DuckDB connection closed")
 
-    total_elapsed = (datetime.now() - start_time).total_seconds()
+    total_elapsed = time.monotonic() - start_time
     avg_rate = total_processed / total_elapsed if total_elapsed > 0 else 0
     success_rate = ((male_count + female_count) / total_processed * 100) if total_processed > 0 else 0
 
@@ -249,6 +350,9 @@ def infer_gender_in_duckdb(db_file, batch_size=100):
     logger.info("CHICKSEXER GENDER INFERENCE COMPLETE")
     logger.info("="*70)
     logger.info(f"Total records processed: {total_processed:,}")
+    logger.info(f"Distinct name predictions: {distinct_predictions:,}")
+    if failed_names:
+        logger.info(f"Names set to neutral after failed predictions: {failed_names:,}")
     logger.info("")
     logger.info("Gender Distribution:")
     logger.info(f"  Male: {male_count:,} ({male_count/total_processed*100:.2f}%)" if total_processed > 0 else "N/A")
@@ -279,8 +383,8 @@ Examples:
   # Infer gender from default database
   python 14_infer_chicksexer.py
 
-  # Infer gender with custom batch size
-  python 14_infer_chicksexer.py --batch-size 50
+  # Pass 1024 names to the model per call
+  python 14_infer_chicksexer.py --predict-batch-size 1024
 
   # Infer gender with custom database file
   python 14_infer_chicksexer.py --db datasets/my_authors.duckdb
@@ -295,7 +399,11 @@ Gender inference:
 Note:
   - chicksexer requires TensorFlow (slower than lookup-based methods)
   - First prediction will be slower as model loads
-  - Recommended batch size: 50-100 for balance of speed and accuracy
+  - --batch-size sets rows fetched from DuckDB; --predict-batch-size sets names
+    per model call (thousands amortize TensorFlow's per-call overhead)
+  - With a CUDA build of TensorFlow the model runs on the GPU automatically;
+    use a larger --predict-batch-size (e.g. 16384) to keep it busy, or set
+    CUDA_VISIBLE_DEVICES="" to force the CPU
         """
     )
 
@@ -309,8 +417,22 @@ Note:
     parser.add_argument(
         '--batch-size',
         type=int,
-        default=100,
-        help='Number of names to process per batch (default: 100)'
+        default=50000,
+        help='Number of authors fetched from the database per batch (default: 50000)'
+    )
+
+    parser.add_argument(
+        '--predict-batch-size',
+        type=int,
+        default=PREDICT_BATCH_SIZE,
+        help=f'Number of names passed to chicksexer per prediction call (default: {PREDICT_BATCH_SIZE})'
+    )
+
+    parser.add_argument(
+        '--flush-rows',
+        type=int,
+        default=FLUSH_ROWS,
+        help=f'Staged results written back per UPDATE (default: {FLUSH_ROWS})'
     )
 
     args = parser.parse_args()
@@ -322,12 +444,15 @@ Note:
     logger.info("="*70)
     logger.info(f"Database file: {args.db}")
     logger.info(f"Batch size: {args.batch_size}")
+    logger.info(f"Prediction batch size: {args.predict_batch_size}")
     logger.info("="*70)
 
     try:
         total_records, male, female, neutral = infer_gender_in_duckdb(
             db_file=args.db,
-            batch_size=args.batch_size
+            batch_size=args.batch_size,
+            predict_batch_size=args.predict_batch_size,
+            flush_rows=args.flush_rows
         )
 
         logger.info("Script completed successfully")
@@ -16,13 +16,19 @@ import sys
 from pathlib import Path
 import logging
 from datetime import datetime
+from multiprocessing import Pool
 import argparse
+import os
 import duckdb
+import pyarrow as pa
+import pyarrow.compute as pc
 
 SCRIPT_DIR = Path(__file__).parent
 PARENT_DIR = SCRIPT_DIR.parent
 sys.path.insert(0, str(PARENT_DIR))
 
+from duckdb_utils import ensure_columns
+
 try:
     from genderizer3.genderizer3 import Genderizer
     GENDERIZER3_AVAILABLE = True
@@ -30,6 +36,12 @@ except ImportError:
     GENDERIZER3_AVAILABLE = False
     print("WARNING: genderizer3 not installed. Install with: pip install genderizer3")
 
+# Runs with fewer distinct forenames than this are classified in-process
+POOL_MIN_FORENAMES = 1000
+
+# Default worker processes for forename classification
+MAX_DEFAULT_WORKERS = 8
+
 
 def setup_logging():
     """
@@ -72,32 +84,84 @@ def ensure_column_exists(conn):
     """
     logger = logging.getLogger(__name__)
 
-    result = conn.execute("PRAGMA table_info(authors)").fetchall()
-    existing_columns = {row[1] for row in result}
+    ensure_columns(conn, 'authors', {'genderizer3_gender': 'TEXT'})
+    logger.info("Column ready: genderizer3_gender (TEXT)")
 
-    logger.info(f"Existing columns: {existing_columns}")
 
-    if 'genderizer3_gender' not in existing_columns:
-        logger.info("Adding column: genderizer3_gender (TEXT)")
-        conn.execute("ALTER TABLE authors ADD COLUMN genderizer3_gender TEXT")
-    else:
-        logger.info("Column already exists: genderizer3_gender")
+def detect_forename(forename):
+    """
+    Detect gender for one forename with genderizer3.
+
+    Args:
+        forename (str): Forename to classify
+
+    Returns:
+        str: Detected gender, or 'unknown' when genderizer3 returns neither male
+        nor female; missing or blank forenames are 'unknown' without calling the model
+    """
+    if not forename or not forename.strip():
+        return 'unknown'
+
+    gender = Genderizer.detect(firstName=forename)
+
+    if gender is None or gender.lower() not in ['male', 'female']:
+        gender = 'unknown'
+
+    return gender
+
+
+def _detect_chunk(forenames):
+    """
+    Detect a chunk of forenames (runs in a worker process or in-process).
+
+    Args:
+        forenames (list): Distinct forenames
+
+    Returns:
+        list: (forename, gender, error) tuples; error is None unless detection
+        raised, in which case the gender is 'unknown'
+    """
+    results = []
+    for forename in forenames:
+        try:
+            results.append((forename, detect_forename(forename), None))
+        except Exception as e:
+            results.append((forename, 'unknown', str(e)))
+    return results
+
+
+def author_filter(force=False):
+    """
+    Build the WHERE condition selecting the authors to classify.
+
+    Args:
+        force (bool): Also select authors that already have a genderizer3_gender
+
+    Returns:
+        str: SQL condition on the authors table
+    """
+    where = "(gender IS NULL OR gender != 'no_forename')"
+    if not force:
+        where += " AND genderizer3_gender IS NULL"
+    return where
 
 
-def infer_gender_in_duckdb(db_file):
+def infer_gender_in_duckdb(db_file, workers=1, force=False):
     """
     Infer gender for authors in DuckDB database using genderizer3.
 
     This function:
     1. Connects to the DuckDB database
     2. Ensures genderizer3_gender column exists
-    3. Reads authors in batches
-    4. Infers gender for each author based on forename
-    5. Updates the database with inferred gender
+    3. Groups authors by forename
+    4. Infers gender once per distinct forename
+    5. Updates all authors with one UPDATE joined on forename
     6. Tracks inference statistics
 
     Args:
         db_file (str or Path): Path to the DuckDB database file
+        workers (int): Number of worker processes classifying forenames (1 = in-process)
+        force (bool): Reclassify authors that already have a genderizer3_gender
 
     Returns:
         tuple: (total_records, male_count, female_count, unknown_count)
@@ -122,79 +186,100 @@ def infer_gender_in_duckdb(db_file):
         raise ImportError("genderizer3 package not available. Install with: pip install genderizer3")
     logger.info("genderizer3 initialized successfully")
 
-    count_query = """
-        SELECT COUNT(*) FROM authors
-        WHERE gender IS NULL OR gender != 'no_forename'
-    """
-    total_count = conn.execute(count_query).fetchone()[0]
+    # genderizer3 only looks at the forename, so classify each distinct
+    # forename once and apply the results to all authors with one UPDATE.
+    # Grouping also gives each forename's author count for the statistics.
+    where = author_filter(force)
+    name_counts = conn.execute(
+        f"""
+        SELECT forename, COUNT(*) AS authors
+        FROM authors
+        WHERE {where}
+        GROUP BY forename
+        """
+    ).fetch_arrow_table()
+    total_count = pc.sum(name_counts['authors']).as_py() or 0
     logger.info(f"Total authors to process: {total_count:,}")
+    logger.info(f"Distinct forenames: {len(name_counts):,}")
 
     batch_size = 10000
-    total_processed = 0
-    male_count = 0
-    female_count = 0
-    unknown_count = 0
+    covered = 0
     start_time = datetime.now()
 
     logger.info("Starting gender inference...")
 
-    offset = 0
-    while offset < total_count:
-        fetch_query = """
-            SELECT author_id, forename, country_name
-            FROM authors
-            WHERE gender IS NULL OR gender != 'no_forename'
-            LIMIT ? OFFSET ?
-        """
-        batch = conn.execute(fetch_query, [batch_size, offset]).fetchall()
-
-        if not batch:
-            break
-
-        updates = []
-        for author_id, forename, country_name in batch:
-            try:
-                gender = Genderizer.detect(firstName=forename)
-
-                if gender is None:
-                    gender = 'unknown'
-                elif gender.lower() not in ['male', 'female']:
-                    gender = 'unknown'
+    # Split the forenames into chunks, classified across worker processes
+    # when there are enough of them to be worth it
+    pending = name_counts['forename'].to_pylist()
+    author_counts = dict(zip(pending, name_counts['authors'].to_pylist()))
+    pool = None
+    if workers > 1 and len(pending) >= POOL_MIN_FORENAMES:
+        logger.info(f"Classifying forenames in {workers} worker processes")
+        pool = Pool(processes=workers)
+        chunk_size = max(1, min(batch_size, -(-len(pending) // (workers * 4))))
+    else:
+        chunk_size = batch_size
+    chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+    chunk_results = pool.imap_unordered(_detect_chunk, chunks) if pool is not None else map(_detect_chunk, chunks)
 
-            except Exception as e:
-                logger.warning(f"Error inferring gender for '{forename}': {e}")
-                gender = 'unknown'
+    forenames = []
+    genders = []
+    for results in chunk_results:
+        for forename, gender, error in results:
+            if error:
+                logger.warning(f"Error inferring gender for '{forename}': {error}")
 
-            if gender == 'male':
-                male_count += 1
-            elif gender == 'female':
-                female_count += 1
-            else:
-                unknown_count += 1
+            forenames.append(forename)
+            genders.append(gender)
+            covered += author_counts[forename]
 
-            updates.append((gender, author_id))
+        elapsed = (datetime.now() - start_time).total_seconds()
+        rate = covered / elapsed if elapsed > 0 else 0
+        pct_complete = (covered / total_count * 100) if total_count > 0 else 0
 
-        conn.executemany(
-            """
-            UPDATE authors
-            SET genderizer3_gender = ?
-            WHERE author_id = ?
-            """,
-            updates
+        logger.info(
+            f"Progress: {len(forenames):,}/{len(pending):,} forenames | "
+            f"{covered:,}/{total_count:,} authors ({pct_complete:.1f}%) | "
+            f"Rate: {rate:.0f} records/sec"
         )
 
-        total_processed += len(batch)
-        offset += batch_size
-
-        elapsed = (datetime.now() - start_time).total_seconds()
-        rate = total_processed / elapsed if elapsed > 0 else 0
-        pct_complete = (total_processed / total_count * 100) if total_count > 0 else 0
+    if pool is not None:
+        pool.close()
+        pool.join()
+
+    # One UPDATE ... FROM joining the forename -> gender map back to authors.
+    # IS NOT DISTINCT FROM lets authors without a forename match their entry.
+    logger.info("Updating authors...")
+    conn.register('genderizer3_name_map', pa.table({
+        'forename': pa.array(forenames, pa.string()),
+        'prediction': pa.array(genders, pa.string()),
+    }))
+    try:
+        # Statistics come from the join, before the UPDATE changes which rows match
+        total_processed, male_count, female_count = conn.execute(
+            f"""
+            SELECT
+                COUNT(*),
+                COUNT(*) FILTER (WHERE m.prediction = 'male'),
+                COUNT(*) FILTER (WHERE m.prediction = 'female')
+            FROM authors
+            JOIN genderizer3_name_map m ON authors.forename IS NOT DISTINCT FROM m.forename
+            WHERE {where}
+            """
+        ).fetchone()
+        unknown_count = total_processed - male_count - female_count
 
-        logger.info(
-            f"Progress: {total_processed:,}/{total_count:,} ({pct_complete:.1f}%) | "
-            f"Rate: {rate:.0f} records/sec | "
-            f"Male: {male_count:,} | Female: {female_count:,} | Unknown: {unknown_count:,}"
+        conn.execute(
+            f"""
+            UPDATE authors
+            SET genderizer3_gender = m.prediction
+            FROM genderizer3_name_map m
+            WHERE authors.forename IS NOT DISTINCT FROM m.forename
+            AND {where}
+            """
         )
+    finally:
+        conn.unregister('genderizer3_name_map')
 
     conn.close()
     logger.info("DuckDB connection closed")
@@ -207,6 +292,7 @@ def infer_gender_in_duckdb(db_file):
     logger.info("GENDERIZER3 GENDER INFERENCE COMPLETE")
     logger.info("="*70)
     logger.info(f"Total records processed: {total_processed:,}")
+    logger.info(f"Distinct forename detections: {len(name_counts):,}")
     logger.info("")
     logger.info("Gender Distribution:")
     logger.info(f"  Male: {male_count:,} ({male_count/total_processed*100:.2f}%)" if total_processed > 0 else "N/A")
@@ -240,6 +326,12 @@ Examples:
   # Infer gender with custom database file
   python 15_infer_genderizer3.py --db datasets/my_authors.duckdb
 
+  # Classify forenames in 4 worker processes
+  python 15_infer_genderizer3.py --workers 4
+
+  # Reclassify authors that already have a prediction
+  python 15_infer_genderizer3.py --force
+
 Gender inference:
   - Uses Naive Bayesian classification
   - Language-independent approach
@@ -256,6 +348,20 @@ Gender inference:
         help=f'Path to the DuckDB database file containing author data (default: {default_db_path})'
     )
 
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Reclassify all authors (default: only authors without a genderizer3_gender)'
+    )
+
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=min(os.cpu_count() or 1, MAX_DEFAULT_WORKERS),
+        help=f'Number of processes classifying forenames '
+             f'(default: CPU count, at most {MAX_DEFAULT_WORKERS})'
+    )
+
     args = parser.parse_args()
 
     logger = setup_logging()
@@ -264,11 +370,14 @@ Gender inference:
     logger.info("AUTHOR GENDER INFERENCE WITH GENDERIZER3")
     logger.info("="*70)
     logger.info(f"Database file: {args.db}")
+    logger.info(f"Workers: {args.workers}")
     logger.info("="*70)
 
     try:
         total_records, male, female, unknown = infer_gender_in_duckdb(
-            db_file=args.db
+            db_file=args.db,
+            workers=args.workers,
+            force=args.force
         )
 
         logger.info("Script completed successfully")
@@ -17,8 +17,116 @@ Population-specific tools get higher weight for their target populations:
 - namesex: General - Chinese 
 """
 
+import json
 from typing import Dict, Optional, Tuple, List
-import logging
+
+import numpy as np
+import pyarrow as pa
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+# Fixed tool order used by the batch consensus
+TOOL_NAMES = (
+    'gendercomputer', 'genderguesser', 'gpt', 'genderpred_in',
+    'namesex', 'persian', 'genderizer3', 'chicksexer'
+)
+
+# Database columns for each tool in TOOL_NAMES order, as
+# (prediction, male probability, female probability)
+TOOL_COLUMNS = (
+    ('gendercomputer_gender', None, None),
+    ('genderguesser_gender', None, None),
+    ('gpt_gender', 'gpt_probability', None),
+    ('genderpred_in_gender', 'genderpred_in_male_prob', 'genderpred_in_female_prob'),
+    ('namesex_gender', 'namesex_prob', None),
+    ('persian_gender', None, None),
+    ('genderizer3_gender', None, None),
+    ('chicksexer_gender', 'chicksexer_male_prob', 'chicksexer_female_prob')
+)
+
+# Tool output values (lowercased, stripped) -> normalized gender; anything
+# else is treated as unknown
+GENDER_NORMALIZATION = {
+    'male': 'male',
+    'm': 'male',
+    '1': 'male',
+    'mostly_male': 'male',
+    'female': 'female',
+    'f': 'female',
+    '0': 'female',
+    'mostly_female': 'female'
+}
+
+# Weight of each tool outside its target population
+BASE_TOOL_WEIGHTS = {
+    'gendercomputer': 1.2,
+    'genderguesser': 1.0,
+    'chicksexer': 1.3,
+    'gpt': 1.5,
+    'genderpred_in': 0.8,
+    'namesex': 1.0,
+    'persian': 0.5,
+    'genderizer3': 0.9
+}
+
+# Population-specific tools, as (tool, substring of the lowercased country,
+# weight for authors from that country)
+POPULATION_BOOSTS = (
+    ('genderpred_in', 'india', 2.0),
+    ('persian', 'iran', 2.0),
+    ('genderizer3', 'turkey', 1.5)
+)
+
+# Compact JSON for the stored vote breakdown (consensus_votes)
+_encode_votes = json.JSONEncoder(separators=(',', ':')).encode
+
+# Normalized gender -> int8 vote code used by the batch consensus
+GENDER_CODE = {'male': 1, 'female': -1, None: 0}
+
+
+def classify_country(country: Optional[str]) -> int:
+    """
+    Classify a country by the target populations of the population-specific tools.
+
+    Args:
+        country (str, optional): Country of the author
+
+    Returns:
+        int: Bitmask with bit i set when the country matches POPULATION_BOOSTS[i]
+    """
+    if not country:
+        return 0
+
+    country_lower = country.lower()
+    return sum(
+        1 << i for i, (_, population, _) in enumerate(POPULATION_BOOSTS)
+        if population in country_lower
+    )
+
+
+def _tool_weight(tool_name: str, country_class: int) -> float:
+    """
+    Weight for a tool given a country class from classify_country.
+    """
+    for i, (boosted_tool, _, weight) in enumerate(POPULATION_BOOSTS):
+        if tool_name == boosted_tool and country_class >> i & 1:
+            return weight
+
+    return BASE_TOOL_WEIGHTS.get(tool_name, 1.0)
+
+
+# Country class -> tool weights in TOOL_NAMES order, built once
+TOOL_WEIGHT_TABLE = np.array(
+    [[_tool_weight(tool, country_class) for tool in TOOL_NAMES] for country_class in range(1 << len(POPULATION_BOOSTS))],
+    dtype=np.float64
+)
+# Plain-float copy for the per-row path
+TOOL_WEIGHT_ROWS = TOOL_WEIGHT_TABLE.tolist()
 
 
 def get_tool_weight(tool_name: str, country: Optional[str] = None) -> float:
@@ -34,28 +142,7 @@ def get_tool_weight(tool_name: str, country: Optional[str] = None) -> float:
     Returns:
         float: Weight value (0.0 to 2.0)
     """
-    if country:
-        country_lower = country.lower()
-
-        if tool_name == 'genderpred_in' and 'india' in country_lower:
-            return 2.0
-        elif tool_name == 'persian' and 'iran' in country_lower:
-            return 2.0
-        elif tool_name == 'genderizer3' and 'turkey' in country_lower:
-            return 1.5
-
-    base_weights = {
-        'gendercomputer': 1.2,
-        'genderguesser': 1.0,
-        'chicksexer': 1.3,
-        'gpt': 1.5,
-        'genderpred_in': 0.8,
-        'namesex': 1.0,
-        'persian': 0.5,
-        'genderizer3': 0.9
-    }
-
-    return base_weights.get(tool_name, 1.0)
+    return _tool_weight(tool_name, classify_country(country))
 
 
 def normalize_gender(gender_value: Optional[str]) -> Optional[str]:
@@ -71,18 +158,7 @@ def normalize_gender(gender_value: Optional[str]) -> Optional[str]:
     if not gender_value:
         return None
 
-    gender_lower = gender_value.lower().strip()
-
-    if gender_lower in ['male', 'm', '1']:
-        return 'male'
-    elif gender_lower in ['female', 'f', '0']:
-        return 'female'
-    elif gender_lower in ['mostly_male']:
-        return 'male'
-    elif gender_lower in ['mostly_female']:
-        return 'female'
-    else:
-        return None
+    return GENDER_NORMALIZATION.get(gender_value.lower().strip())
 
 
 def calculate_consensus(
@@ -135,26 +211,43 @@ def calculate_consensus(
             - confidence (float): Confidence score (0.0 to 1.0)
             - vote_breakdown (dict): {'male': weight, 'female': weight, 'unknown': weight}
     """
-    logger = logging.getLogger(__name__)
+    return calculate_consensus_row(
+        (gendercomputer, genderguesser, gpt, genderpred_in, namesex, persian, genderizer3, chicksexer),
+        (None, None, gpt_prob, genderpred_in_male_prob, namesex_prob, None, None, chicksexer_male_prob),
+        (None, None, None, genderpred_in_female_prob, None, None, None, chicksexer_female_prob),
+        country
+    )
+
+
+def calculate_consensus_row(
+    predictions: Tuple,
+    male_probs: Tuple,
+    female_probs: Tuple,
+    country: Optional[str] = None
+) -> Tuple[Optional[str], float, Dict[str, float]]:
+    """
+    Positional form of calculate_consensus for per-row loops.
+
+    Takes the tool values as sequences in TOOL_NAMES order (None where a tool
+    has no prediction or probability), so no per-call dict is built.
+
+    Args:
+        predictions (tuple): Tool predictions in TOOL_NAMES order
+        male_probs (tuple): Male probabilities in TOOL_NAMES order
+        female_probs (tuple): Female probabilities in TOOL_NAMES order
+        country (str, optional): Author's country for population-specific weighting
 
+    Returns:
+        tuple: (consensus_gender, confidence, vote_breakdown), as from calculate_consensus
+    """
     male_votes = 0.0
     female_votes = 0.0
     unknown_votes = 0.0
     total_weight = 0.0
 
-    tools = {
-        'gendercomputer': (gendercomputer, None, None),
-        'genderguesser': (genderguesser, None, None),
-        'gpt': (gpt, gpt_prob, None),
-        'genderpred_in': (genderpred_in, genderpred_in_male_prob, genderpred_in_female_prob),
-        'namesex': (namesex, namesex_prob, None),
-        'persian': (persian, None, None),
-        'genderizer3': (genderizer3, None, None),
-        'chicksexer': (chicksexer, chicksexer_male_prob, chicksexer_female_prob)
-    }
+    weights = TOOL_WEIGHT_ROWS[classify_country(country)]
 
-    for tool_name, (prediction, male_prob, female_prob) in tools.items():
-        base_weight = get_tool_weight(tool_name, country)
+    for prediction, base_weight, male_prob, female_prob in zip(predictions, weights, male_probs, female_probs):
 
         normalized = normalize_gender(prediction)
 
@@ -197,76 +290,230 @@ def calculate_consensus(
     return consensus, round(confidence, 4), vote_breakdown
 
 
-def apply_consensus_to_batch(
-    batch: List[Tuple],
-    column_indices: Dict[str, int]
-) -> List[Tuple[Optional[str], float, str]]:
+def _map_distinct(values, func, dtype) -> np.ndarray:
     """
-    Apply consensus logic to a batch of author records.
+    Apply func once per distinct value of a column and gather the results.
+    """
+    resolved = {value: func(value) for value in set(values)}
+    return np.fromiter((resolved[value] for value in values), dtype=dtype, count=len(values))
+
+
+def _consensus_batch_numba(codes, male_probs, female_probs, country_class,
+                           out_label, out_conf, out_votes):
+    """
+    Weighted gender vote over N authors, one independent row per iteration.
+
+    codes holds the (N, T) int8 votes (1 male, -1 female, 0 unknown) in
+    TOOL_NAMES order, the probabilities are (N, T) float64 (NaN when missing)
+    and country_class is the length-N classify_country result. Results are
+    written into out_label (0 male, 1 female, 2 uncertain), out_conf (N,) and
+    out_votes (N, 3: male, female, unknown).
+
+    Votes are summed in TOOL_NAMES order, as in calculate_consensus_row, and
+    without fastmath so the results match it exactly.
+    """
+    for i in prange(codes.shape[0]):
+        male_votes = 0.0
+        female_votes = 0.0
+        unknown_votes = 0.0
+        total_weight = 0.0
+
+        for t in range(codes.shape[1]):
+            weight = TOOL_WEIGHT_TABLE[country_class[i], t]
+            code = codes[i, t]
+            if code == 1:
+                prob = male_probs[i, t]
+                male_votes += weight * (prob if prob > 0 else 1.0)
+            elif code == -1:
+                prob = female_probs[i, t]
+                female_votes += weight * (prob if prob > 0 else 1.0)
+            else:
+                unknown_votes += weight * 0.5
+            total_weight += weight
+
+        male_ratio = male_votes / total_weight if total_weight > 0 else 0.0
+        female_ratio = female_votes / total_weight if total_weight > 0 else 0.0
+
+        if male_ratio > 0.5 and male_ratio > female_ratio:
+            out_label[i] = 0
+        elif female_ratio > 0.5 and female_ratio > male_ratio:
+            out_label[i] = 1
+        else:
+            out_label[i] = 2
+        out_conf[i] = max(male_ratio, female_ratio)
+        out_votes[i, 0] = male_votes
+        out_votes[i, 1] = female_votes
+        out_votes[i, 2] = unknown_votes
+
+
+if NUMBA_AVAILABLE:
+    _consensus_batch_numba = njit(parallel=True, cache=True)(_consensus_batch_numba)
+
+
+def _consensus_batch_numpy(codes, male_probs, female_probs, country_class,
+                           out_label, out_conf, out_votes):
+    """
+    Column-at-a-time NumPy version of _consensus_batch_numba, used when numba
+    is not installed. Same arguments and outputs.
+    """
+    n = codes.shape[0]
+    male_votes = np.zeros(n)
+    female_votes = np.zeros(n)
+    unknown_votes = np.zeros(n)
+    total_weight = np.zeros(n)
+
+    tool_weights = TOOL_WEIGHT_TABLE[country_class]
+
+    for t in range(codes.shape[1]):
+        weights = tool_weights[:, t]
+
+        # Missing or non-positive probabilities count as 1.0 (NaN > 0 is False)
+        male_prob = np.where(male_probs[:, t] > 0, male_probs[:, t], 1.0)
+        female_prob = np.where(female_probs[:, t] > 0, female_probs[:, t], 1.0)
+
+        male_votes += np.where(codes[:, t] == 1, weights * male_prob, 0.0)
+        female_votes += np.where(codes[:, t] == -1, weights * female_prob, 0.0)
+        unknown_votes += np.where(codes[:, t] == 0, weights * 0.5, 0.0)
+        total_weight += weights
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        male_ratio = np.where(total_weight > 0, male_votes / total_weight, 0.0)
+        female_ratio = np.where(total_weight > 0, female_votes / total_weight, 0.0)
+
+    threshold = 0.5
+    is_male = (male_ratio > threshold) & (male_ratio > female_ratio)
+    is_female = (female_ratio > threshold) & (female_ratio > male_ratio)
+
+    out_label[:] = np.where(is_male, 0, np.where(is_female, 1, 2))
+    # The winning ratio is always the larger one, and so is the uncertain confidence
+    out_conf[:] = np.maximum(male_ratio, female_ratio)
+    out_votes[:, 0] = male_votes
+    out_votes[:, 1] = female_votes
+    out_votes[:, 2] = unknown_votes
+
+
+_consensus_batch = _consensus_batch_numba if NUMBA_AVAILABLE else _consensus_batch_numpy
+
+# Batch kernel label -> consensus gender
+CONSENSUS_LABELS = np.array(['male', 'female', None], dtype=object)
+
+
+def calculate_consensus_batch(
+    predictions: np.ndarray,
+    male_probs: np.ndarray,
+    female_probs: np.ndarray,
+    countries: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calculate consensus gender for a whole batch of authors.
+
+    Gives the same results as calling calculate_consensus on each row, but
+    unrounded (np.round does not always agree with round). Tool predictions
+    are normalized to int8 votes (1 male, -1 female, 0 unknown) and countries
+    to classify_country classes, once per distinct value; the weighted vote
+    then runs in the numba kernel (in parallel over rows) when numba is
+    installed, or column-at-a-time in NumPy otherwise.
 
     Args:
-        batch (list): List of tuples containing author data
-        column_indices (dict): Mapping of column names to their indices in the batch tuples
+        predictions: (N, T) object array of tool predictions in TOOL_NAMES order
+        male_probs: (N, T) float array of male probabilities (NaN when missing)
+        female_probs: (N, T) float array of female probabilities (NaN when missing)
+        countries: Length-N object array of author countries
 
     Returns:
-        list: List of tuples (consensus_gender, confidence, vote_breakdown_json)
+        Tuple of (consensus, confidence, votes):
+            - consensus: object array of 'male', 'female' or None if uncertain
+            - confidence: float array of confidence scores (0.0 to 1.0)
+            - votes: (N, 3) float array of male, female and unknown weights
     """
-    results = []
+    n = len(countries)
+    n_tools = len(TOOL_NAMES)
 
-    for row in batch:
-        kwargs = {}
+    codes = np.empty((n, n_tools), dtype=np.int8)
+    for t in range(n_tools):
+        codes[:, t] = _map_distinct(predictions[:, t], lambda g: GENDER_CODE[normalize_gender(g)], np.int8)
+    country_class = _map_distinct(countries, classify_country, np.int8)
 
-        if 'gendercomputer_gender' in column_indices:
-            kwargs['gendercomputer'] = row[column_indices['gendercomputer_gender']]
+    out_label = np.empty(n, dtype=np.int8)
+    out_conf = np.empty(n, dtype=np.float64)
+    out_votes = np.empty((n, 3), dtype=np.float64)
 
-        if 'genderguesser_gender' in column_indices:
-            kwargs['genderguesser'] = row[column_indices['genderguesser_gender']]
+    _consensus_batch(
+        codes,
+        np.ascontiguousarray(male_probs, dtype=np.float64),
+        np.ascontiguousarray(female_probs, dtype=np.float64),
+        country_class,
+        out_label, out_conf, out_votes
+    )
 
-        if 'gpt_gender' in column_indices:
-            kwargs['gpt'] = row[column_indices['gpt_gender']]
-        if 'gpt_probability' in column_indices:
-            kwargs['gpt_prob'] = row[column_indices['gpt_probability']]
+    return CONSENSUS_LABELS[out_label], out_conf, out_votes
 
-        if 'genderpred_in_gender' in column_indices:
-            kwargs['genderpred_in'] = row[column_indices['genderpred_in_gender']]
-        if 'genderpred_in_male_prob' in column_indices:
-            kwargs['genderpred_in_male_prob'] = row[column_indices['genderpred_in_male_prob']]
-        if 'genderpred_in_female_prob' in column_indices:
-            kwargs['genderpred_in_female_prob'] = row[column_indices['genderpred_in_female_prob']]
 
-        if 'namesex_gender' in column_indices:
-            kwargs['namesex'] = row[column_indices['namesex_gender']]
-        if 'namesex_prob' in column_indices:
-            kwargs['namesex_prob'] = row[column_indices['namesex_prob']]
+def _arrow_column(column, dtype) -> np.ndarray:
+    """
+    Return an Arrow column as a NumPy array: object (None for nulls) for
+    strings, float64 (NaN for nulls) for probabilities.
+    """
+    column = column.combine_chunks() if isinstance(column, pa.ChunkedArray) else column
+    if dtype != object:
+        column = column.cast(pa.float64())
+    return column.to_numpy(zero_copy_only=False)
 
-        if 'persian_gender' in column_indices:
-            kwargs['persian'] = row[column_indices['persian_gender']]
 
-        if 'genderizer3_gender' in column_indices:
-            kwargs['genderizer3'] = row[column_indices['genderizer3_gender']]
+def apply_consensus_to_batch(batch) -> Tuple[List[str], List[float], List[str]]:
+    """
+    Apply consensus logic to a batch of author records.
 
-        if 'chicksexer_gender' in column_indices:
-            kwargs['chicksexer'] = row[column_indices['chicksexer_gender']]
-        if 'chicksexer_male_prob' in column_indices:
-            kwargs['chicksexer_male_prob'] = row[column_indices['chicksexer_male_prob']]
-        if 'chicksexer_female_prob' in column_indices:
-            kwargs['chicksexer_female_prob'] = row[column_indices['chicksexer_female_prob']]
+    The batch schema is resolved to column positions once, and only the
+    columns present are read into the arrays passed to
+    calculate_consensus_batch; tool columns missing from the batch count as
+    no prediction.
 
-        if 'country_name' in column_indices:
-            kwargs['country'] = row[column_indices['country_name']]
+    Args:
+        batch: pyarrow RecordBatch or Table with one row per author, with the
+            column names in TOOL_COLUMNS plus country_name
 
-        consensus, confidence, votes = calculate_consensus(**kwargs)
+    Returns:
+        tuple: (consensus_gender, confidence, vote_breakdown_json) lists with
+            one entry per author; consensus_gender is '' when uncertain
+    """
+    n = batch.num_rows
+    if n == 0:
+        return [], [], []
+
+    predictions = np.full((n, len(TOOL_NAMES)), None, dtype=object)
+    male_probs = np.full((n, len(TOOL_NAMES)), np.nan)
+    female_probs = np.full((n, len(TOOL_NAMES)), np.nan)
+    countries = np.full(n, None, dtype=object)
+
+    # (target array, tool slot, batch position) for every column the batch has;
+    # absent columns keep their None/NaN fill
+    positions = {name: i for i, name in enumerate(batch.schema.names)}
+    schema = [
+        (target, t, positions[name])
+        for t, names in enumerate(TOOL_COLUMNS)
+        for target, name in zip((predictions, male_probs, female_probs), names)
+        if name in positions
+    ]
 
-        vote_json = str(votes)
+    for target, t, position in schema:
+        target[:, t] = _arrow_column(batch.column(position), target.dtype)
+    if 'country_name' in positions:
+        countries[:] = _arrow_column(batch.column(positions['country_name']), object)
 
-        results.append((consensus if consensus else '', confidence, vote_json))
+    consensus, confidence, votes = calculate_consensus_batch(predictions, male_probs, female_probs, countries)
 
-    return results
+    return (
+        [gender if gender else '' for gender in consensus],
+        [round(conf, 4) for conf in confidence.tolist()],
+        [
+            _encode_votes({'male': round(male, 2), 'female': round(female, 2), 'unknown': round(unknown, 2)})
+            for male, female, unknown in votes.tolist()
+        ]
+    )
 
 
 if __name__ == '__main__':
-    import json
-
     test_cases = [
         {
             'name': 'All agree on male',
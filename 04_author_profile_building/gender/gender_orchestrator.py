@@ -26,15 +26,21 @@ from pathlib import Path
 import logging
 from datetime import datetime
 import argparse
+import importlib
 import subprocess
 import duckdb
+import pyarrow as pa
 
 SCRIPT_DIR = Path(__file__).parent
 PARENT_DIR = SCRIPT_DIR.parent
 sys.path.insert(0, str(SCRIPT_DIR))
 sys.path.insert(0, str(PARENT_DIR))
 
-from gender_consensus import calculate_consensus
+from gender_consensus import apply_consensus_to_batch
+from duckdb_utils import bulk_update, configure_connection
+
+# Tools whose scripts expose run() and can share the orchestrator's process
+IN_PROCESS_TOOLS = {'genderpred_in', 'namesex'}
 
 
 def setup_logging():
@@ -113,6 +119,47 @@ def run_tool(script_name: str, db_path: Path, extra_args: list = None) -> bool:
         return False
 
 
+def run_tool_in_process(script_name: str, db_path: Path) -> bool:
+    """
+    Run a gender inference tool by importing its script and calling run().
+
+    Avoids starting a new interpreter per tool, which re-imports DuckDB,
+    pandas and the tool's ML stack (TensorFlow for genderpred-in,
+    scikit-learn for namesex).
+
+    Args:
+        script_name (str): Name of the script to run
+        db_path (Path): Path to the database
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    logger = logging.getLogger(__name__)
+
+    script_path = SCRIPT_DIR / script_name
+
+    if not script_path.exists():
+        logger.warning(f"Script not found: {script_name} - skipping")
+        return False
+
+    logger.info("="*70)
+    logger.info(f"Running: {script_name}")
+    logger.info("="*70)
+
+    try:
+        module = importlib.import_module(script_path.stem)
+    except Exception as e:
+        logger.error(f"✗ {script_name} could not be loaded: {e}")
+        return False
+
+    if module.run(db_path):
+        logger.info(f"✓ {script_name} completed successfully")
+        return True
+
+    logger.error(f"✗ {script_name} failed")
+    return False
+
+
 def ensure_consensus_columns(conn):
     """
     Ensure consensus columns exist in the authors table.
@@ -164,10 +211,13 @@ def calculate_and_store_consensus(db_path: Path):
     logger.info("="*70)
 
     conn = duckdb.connect(str(db_path))
+    configure_connection(conn)
 
     ensure_consensus_columns(conn)
 
-    query = """
+    source_filter = "gender IS NULL OR gender != 'no_forename'"
+
+    query = f"""
         SELECT
             author_id,
             country_name,
@@ -184,12 +234,12 @@ def calculate_and_store_consensus(db_path: Path):
             chicksexer_male_prob,
             chicksexer_female_prob
         FROM authors
-        WHERE gender IS NULL OR gender != 'no_forename'
+        WHERE {source_filter}
     """
 
-    logger.info("Fetching author data for consensus calculation...")
-    results = conn.execute(query).fetchall()
-    total_count = len(results)
+    total_count = conn.execute(
+        f"SELECT COUNT(*) FROM authors WHERE {source_filter}"
+    ).fetchone()[0]
     logger.info(f"Processing {total_count:,} authors")
 
     batch_size = 10000
@@ -199,59 +249,29 @@ def calculate_and_store_consensus(db_path: Path):
     uncertain_count = 0
     start_time = datetime.now()
 
-    for offset in range(0, total_count, batch_size):
-        batch = results[offset:offset + batch_size]
-        updates = []
-
-        for row in batch:
-            (
-                author_id, country_name,
-                gc_gender, gg_gender,
-                gpi_gender, gpi_male_prob, gpi_female_prob,
-                ns_gender, ns_prob,
-                persian_gender,
-                g3_gender,
-                cs_gender, cs_male_prob, cs_female_prob
-            ) = row
-
-            consensus, confidence, votes = calculate_consensus(
-                gendercomputer=gc_gender,
-                genderguesser=gg_gender,
-                genderpred_in=gpi_gender,
-                genderpred_in_male_prob=gpi_male_prob,
-                genderpred_in_female_prob=gpi_female_prob,
-                namesex=ns_gender,
-                namesex_prob=ns_prob,
-                persian=persian_gender,
-                genderizer3=g3_gender,
-                chicksexer=cs_gender,
-                chicksexer_male_prob=cs_male_prob,
-                chicksexer_female_prob=cs_female_prob,
-                country=country_name
-            )
-
-            if consensus == 'male':
-                male_count += 1
-            elif consensus == 'female':
-                female_count += 1
-            else:
-                uncertain_count += 1
-
-            vote_json = str(votes)
-            updates.append((consensus if consensus else '', confidence, vote_json, author_id))
-
-        conn.executemany(
-            """
-            UPDATE authors
-            SET consensus_gender = ?,
-                consensus_confidence = ?,
-                consensus_votes = ?
-            WHERE author_id = ?
-            """,
-            updates
-        )
+    # Stream Arrow record batches on a separate cursor so the UPDATEs issued
+    # on conn do not invalidate the open result
+    reader = conn.cursor().execute(query).fetch_record_batch(batch_size)
+
+    for batch in reader:
+        # Consensus for the whole batch at once over the Arrow columns
+        consensus, confidence, votes = apply_consensus_to_batch(batch)
+
+        batch_male = consensus.count('male')
+        batch_female = consensus.count('female')
+        male_count += batch_male
+        female_count += batch_female
+        uncertain_count += batch.num_rows - batch_male - batch_female
 
-        total_processed += len(batch)
+        # One set-based UPDATE per batch instead of one statement per row
+        bulk_update(conn, 'authors', 'author_id', pa.table({
+            'consensus_gender': pa.array(consensus, pa.string()),
+            'consensus_confidence': pa.array(confidence, pa.float64()),
+            'consensus_votes': pa.array(votes, pa.string()),
+            'author_id': batch.column('author_id'),
+        }))
+
+        total_processed += batch.num_rows
 
         elapsed = (datetime.now() - start_time).total_seconds()
         rate = total_processed / elapsed if elapsed > 0 else 0
@@ -312,6 +332,9 @@ Examples:
   # Only run specific tools
   python gender_orchestrator.py --only gendercomputer genderguesser
 
+  # Run every tool as a separate script (no in-process tools)
+  python gender_orchestrator.py --subprocess
+
 Tools:
   - gendercomputer: General purpose (using genderComputer)
   - genderguesser: General purpose (using gender-guesser)
@@ -322,7 +345,7 @@ Tools:
   - genderizer3: Turkish/multilingual (using genderizer3)
 
 The orchestrator will:
-1. Run each selected tool in sequence
+1. Run each selected tool in sequence (genderpred_in and namesex in-process)
 2. Log progress for monitoring
 3. Calculate weighted consensus based on population
 4. Store results in consensus_gender, consensus_confidence, consensus_votes columns
@@ -350,6 +373,13 @@ The orchestrator will:
         help='Only run specific tools (space-separated list)'
     )
 
+    parser.add_argument(
+        '--subprocess',
+        action='store_true',
+        help='Run every tool as a separate Python process instead of running '
+             'genderpred_in and namesex in-process'
+    )
+
     args = parser.parse_args()
 
     logger = setup_logging()
@@ -387,7 +417,10 @@ The orchestrator will:
             logger.info(f"Skipping {tool_name} (in --skip list)")
             continue
 
-        success = run_tool(script_name, db_path)
+        if tool_name in IN_PROCESS_TOOLS and not args.subprocess:
+            success = run_tool_in_process(script_name, db_path)
+        else:
+            success = run_tool(script_name, db_path)
         results[tool_name] = success
 
     logger.info("="*70)